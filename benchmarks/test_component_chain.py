@@ -0,0 +1,36 @@
+"""
+Re-renders a chain of components 50 deep, where each passes the rest of the chain on as
+its children. Comparing whole elements at every level would make this quadratic in depth,
+``structural`` measures that for comparison.
+"""
+import pytest
+
+from extra_qt import render, Component
+from extra_qt.dom.qt_dom import group, label, create_element
+from extra_qt.renderers import renderer
+
+DEPTH = 50
+
+
+class Link(Component):
+    def render(self):
+        return group(dict(title=self.props['title']), self.children)
+
+
+def chain(tick):
+    element = label(f'Leaf {tick}')
+    for depth in range(DEPTH):
+        element = create_element(Link, dict(title=f'Link {depth}'), [element])
+
+    return element
+
+
+@pytest.mark.parametrize('comparison', ['shallow', 'structural'])
+def test_chain_update(benchmark, dict_container, monkeypatch, comparison):
+    if comparison == 'structural':
+        monkeypatch.setattr(renderer, 'is_same_markup', lambda previous, latest: previous == latest)
+
+    ticks = iter(range(1, 10 ** 6))
+    render(chain(0), dict_container)
+
+    benchmark(lambda: render(chain(next(ticks)), dict_container))
@@ -0,0 +1,59 @@
+"""
+Updates one price on a dashboard of 200 tickers. ``props`` passes the prices down through
+the table to memoized rows, ``context`` provides them to rows which select their own price.
+"""
+import pytest
+
+from extra_qt import render, batched_updates, Component, PureComponent, create_context, use_context
+from extra_qt.dom.qt_dom import group, label, create_element
+
+N_TICKERS = 200
+SYMBOLS = [f'T{i:03}' for i in range(N_TICKERS)]
+
+prices = create_context({})
+
+
+class PropsRow(PureComponent):
+    def render(self):
+        return label(f'{self.props["symbol"]}: {self.props["price"]:.2f}')
+
+
+class PropsTable(Component):
+    def render(self):
+        return group(dict(title='Tickers'), [
+            create_element(PropsRow, dict(symbol=s, price=self.props['prices'][s], key=s)) for s in SYMBOLS
+        ])
+
+
+def ContextRow(props, children):
+    price = use_context(prices, lambda p: p[props['symbol']])
+    return label(f'{props["symbol"]}: {price:.2f}')
+
+
+class ContextTable(PureComponent):
+    def render(self):
+        return group(dict(title='Tickers'), [create_element(ContextRow, dict(symbol=s, key=s)) for s in SYMBOLS])
+
+
+class Dashboard(Component):
+    initial_state = {s: 100.0 for s in SYMBOLS}
+
+    def render(self):
+        if self.props['sharing'] == 'props':
+            return create_element(PropsTable, dict(prices=self.state))
+
+        return prices.provider(self.state, create_element(ContextTable))
+
+
+@pytest.mark.parametrize('sharing', ['props', 'context'])
+def test_tick(benchmark, dict_container, sharing):
+    ticks = iter(range(1, 10 ** 6))
+    render(create_element(Dashboard, dict(sharing=sharing)), dict_container)
+    dashboard = dict_container.rendered.component
+
+    def tick():
+        i = next(ticks)
+        with batched_updates():
+            dashboard.set_state({SYMBOLS[i % N_TICKERS]: 100.0 + i})
+
+    benchmark(tick)
@@ -0,0 +1,47 @@
+"""
+Mounts and re-renders 5000 leaf components, written as ``Component`` classes and as
+function components. Each leaf derives a name from its ``i`` prop, which the function
+component memoizes with ``use_memo``, while the class computes it on every render.
+"""
+import pytest
+
+from extra_qt import render, Component, use_memo
+from extra_qt.dom.qt_dom import group, label, create_element
+from extra_qt.renderers.dict_renderer import DictNode
+
+N_LEAVES = 5000
+
+
+def leaf_name(i):
+    return '-'.join(f'{(i * k) % 97:02}' for k in range(1, 9))
+
+
+class ClassLeaf(Component):
+    def render(self):
+        return label(f'{leaf_name(self.props["i"])} {self.props["tick"]}')
+
+
+def FunctionLeaf(props, children):
+    name = use_memo(lambda: leaf_name(props['i']), (props['i'],))
+    return label(f'{name} {props["tick"]}')
+
+
+LEAVES = {'class': ClassLeaf, 'function': FunctionLeaf}
+
+
+def leaves(leaf, tick):
+    return group(dict(title='Leaves'), [create_element(leaf, dict(i=i, tick=tick)) for i in range(N_LEAVES)])
+
+
+@pytest.mark.parametrize('kind', list(LEAVES))
+def test_mount(benchmark, dict_container, kind):
+    tree = leaves(LEAVES[kind], 0)
+    benchmark(lambda: render(tree, DictNode.container()))
+
+
+@pytest.mark.parametrize('kind', list(LEAVES))
+def test_update(benchmark, dict_container, kind):
+    ticks = iter(range(1, 10 ** 6))
+    render(leaves(LEAVES[kind], 0), dict_container)
+
+    benchmark(lambda: render(leaves(LEAVES[kind], next(ticks)), dict_container))
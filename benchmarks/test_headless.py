@@ -0,0 +1,108 @@
+"""
+Reconciler throughput, measured against the headless dict renderer so that the numbers
+reflect the reconciler itself rather than Qt.
+"""
+import random
+
+import pytest
+
+from extra_qt import render, Component, batched_updates
+from extra_qt.dom.qt_dom import group, label, create_element
+from extra_qt.renderers.dict_renderer import DictNode
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+DEPTH = 100
+ROUNDS = 3
+
+
+def wide(n, tick=0):
+    return group(dict(title='Wide'), [label(f'Label {i} {tick}') for i in range(n)])
+
+
+def deep(n, tick=0):
+    """
+    ``n`` nodes, in chains of nested groups ``DEPTH`` deep with a label at the bottom of each.
+    """
+    def chain(i, depth):
+        if depth == 0:
+            return label(f'Leaf {i} {tick}')
+
+        return group(dict(title=f'Level {depth}'), [chain(i, depth - 1)])
+
+    return group(dict(title='Deep'), [chain(i, DEPTH - 1) for i in range(n // DEPTH)])
+
+
+def keyed(items):
+    return group(dict(title='Rows'), [label(f'Row {i}', dict(key=i)) for i in items])
+
+
+class Counter(Component):
+    initial_state = 0
+
+    def render(self):
+        return label(str(self.state))
+
+
+def run_update(benchmark, container, initial, updated):
+    def setup():
+        render(initial, container)
+        return (updated, container), {}
+
+    benchmark.pedantic(render, setup=setup, rounds=ROUNDS)
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_mount(benchmark, dict_container, n):
+    tree = wide(n)
+
+    def setup():
+        return (tree, DictNode.container()), {}
+
+    benchmark.pedantic(render, setup=setup, rounds=ROUNDS)
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_deep_update(benchmark, dict_container, n):
+    run_update(benchmark, dict_container, deep(n, 0), deep(n, 1))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_wide_update(benchmark, dict_container, n):
+    run_update(benchmark, dict_container, wide(n, 0), wide(n, 1))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_list_insert(benchmark, dict_container, n):
+    items = list(range(n))
+    run_update(benchmark, dict_container, keyed(items), keyed([-1] + items))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_list_remove(benchmark, dict_container, n):
+    items = list(range(n))
+    run_update(benchmark, dict_container, keyed(items), keyed(items[:n // 2] + items[n // 2 + 1:]))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_list_shuffle(benchmark, dict_container, n):
+    items = list(range(n))
+    shuffled = list(items)
+    random.Random(0).shuffle(shuffled)
+    run_update(benchmark, dict_container, keyed(items), keyed(shuffled))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_set_state_storm(benchmark, dict_container, n):
+    """
+    Every component in a list sets its state several times in the same batch.
+    """
+    render(group(dict(title='Counters'), [create_element(Counter) for _ in range(n)]), dict_container)
+    counters = [w.component for w in dict_container.rendered.wrapped_children]
+
+    def storm():
+        with batched_updates():
+            for counter in counters:
+                for _ in range(5):
+                    counter.set_state(lambda s: s + 1)
+
+    benchmark.pedantic(storm, rounds=ROUNDS)
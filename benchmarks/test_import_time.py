@@ -0,0 +1,31 @@
+"""
+Imports the package in a fresh interpreter with ``python -X importtime``. Building markup
+and rendering headlessly should not pay for Qt, which is loaded by the Qt renderer alone.
+``extra_info['import_us']`` is the cumulative import time of the module reported by Python.
+"""
+import subprocess
+import sys
+
+import pytest
+
+MODULES = ['extra_qt', 'extra_qt.renderers.dict_renderer', 'extra_qt.renderers.qt_renderer']
+
+
+def import_time(module: str) -> int:
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True,
+    ).stderr
+
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative)
+
+    raise ValueError(f'{module} was not imported')
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import(benchmark, module):
+    benchmark.extra_info['import_us'] = benchmark.pedantic(import_time, args=(module,), rounds=5)
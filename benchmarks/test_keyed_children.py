@@ -0,0 +1,45 @@
+"""
+Compares updating a long list of rows with and without keys. Without keys, inserting
+at the front of the list re-receives (and re-renders) every row after the insertion.
+"""
+import random
+
+import pytest
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label
+
+N_ROWS = 2000
+
+
+def make_list(items, keyed):
+    return group(dict(title='Rows'), [
+        label(f'Row {i}', dict(key=i) if keyed else None) for i in items
+    ])
+
+
+def insert_front(items):
+    return [-1] + items
+
+
+def delete_middle(items):
+    return items[:len(items) // 2] + items[len(items) // 2 + 1:]
+
+
+def shuffle(items):
+    items = list(items)
+    random.Random(0).shuffle(items)
+    return items
+
+
+@pytest.mark.parametrize('keyed', [True, False], ids=['keyed', 'unkeyed'])
+@pytest.mark.parametrize('edit', [insert_front, delete_middle, shuffle])
+def test_list_update(benchmark, qt_container, keyed, edit):
+    items = list(range(N_ROWS))
+
+    def setup():
+        # (re)render the original list so each round applies the same edit
+        render(make_list(items, keyed), qt_container)
+        return (make_list(edit(items), keyed), qt_container), {}
+
+    benchmark.pedantic(render, setup=setup, rounds=5)
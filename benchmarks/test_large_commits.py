@@ -0,0 +1,48 @@
+"""
+Updates every label in a visible window of 10k widgets, and mounts such a tree into it,
+with and without repaints suspended for the commit. Each round includes the event loop
+pass which lays out and paints the result.
+"""
+import pytest
+
+from extra_qt import render, reconciler
+from extra_qt.dom.qt_dom import group, label
+
+N_GROUPS = 100
+N_LABELS = 100
+
+
+def tree(tick):
+    return group(dict(title='Root'), [
+        group(dict(title=f'Group {g}'), [label(f'Label {g} {i} {tick}') for i in range(N_LABELS)])
+        for g in range(N_GROUPS)
+    ])
+
+
+@pytest.mark.parametrize('suspend', [True, False], ids=['suspended', 'painting'])
+def test_update_visible_tree(benchmark, qt_app, qt_container, monkeypatch, suspend):
+    if not suspend:
+        monkeypatch.setattr(reconciler, 'suspend_updates_after', float('inf'))
+
+    qt_container.show()
+    render(tree(0), qt_container)
+    qt_app.processEvents()
+    ticks = iter(range(1, 10 ** 6))
+
+    def update():
+        render(tree(next(ticks)), qt_container)
+        qt_app.processEvents()
+
+    benchmark.pedantic(update, rounds=5)
+
+
+def test_mount_into_visible_window(benchmark, qt_app, qt_container):
+    qt_container.show()
+    shown = [False]
+
+    def toggle():
+        shown[0] = not shown[0]
+        render(tree(0) if shown[0] else group(dict(title='Root'), []), qt_container)
+        qt_app.processEvents()
+
+    benchmark.pedantic(toggle, rounds=6)
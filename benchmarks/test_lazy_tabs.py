@@ -0,0 +1,31 @@
+"""
+Mounts a settings dialog of 12 heavy tabs, with every tab mounted up front and lazily.
+"""
+import pytest
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, tabs
+
+N_TABS = 12
+N_SETTINGS = 200
+
+
+def dialog(lazy):
+    names = [f'Tab {t}' for t in range(N_TABS)]
+    return tabs(dict(labels=names, lazy=lazy), [
+        group(dict(title=name), [label(f'{name} setting {i}') for i in range(N_SETTINGS)]) for name in names
+    ])
+
+
+@pytest.mark.parametrize('lazy', [False, True], ids=['eager', 'lazy'])
+def test_mount_dialog(benchmark, qt_container, lazy):
+    tree = dialog(lazy)
+
+    def setup():
+        container = QWidget()
+        container.setLayout(QVBoxLayout())
+        return (tree, container), {}
+
+    benchmark.pedantic(render, setup=setup, rounds=5)
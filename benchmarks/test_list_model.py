@@ -0,0 +1,34 @@
+"""
+Changes one entry of a 20k entry combo box. ``model`` diffs the new keys into the list
+model, ``rebuild`` clears and refills the combo box the way ``build_combo_box`` used to.
+"""
+import pytest
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import combo_box, group
+
+N_ITEMS = 20000
+
+
+def symbols(tick):
+    keys = [f'SYM{i}' for i in range(N_ITEMS)]
+    keys[N_ITEMS // 2] = f'TICK{tick}'
+    return keys
+
+
+def rebuild(combo, keys):
+    combo.clear()
+    for k in keys:
+        combo.addItem(k, k)
+
+
+@pytest.mark.parametrize('kind', ['model', 'rebuild'])
+def test_change_one_item(benchmark, qt_container, kind):
+    ticks = iter(range(1, 10 ** 6))
+    render(group(dict(title='Symbols'), [combo_box(keys=symbols(0))]), qt_container)
+    combo = qt_container.rendered.wrapped_children[0].host_node
+
+    if kind == 'model':
+        benchmark(lambda: render(group(dict(title='Symbols'), [combo_box(keys=symbols(next(ticks)))]), qt_container))
+    else:
+        benchmark(lambda: rebuild(combo, symbols(next(ticks))))
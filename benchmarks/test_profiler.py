@@ -0,0 +1,31 @@
+"""
+Re-renders a list of components with and without the profiler installed. Without it the
+numbers should match ``test_headless.py``, as the hooks only check for a profiler.
+"""
+import pytest
+
+from extra_qt import render, profile, Component
+from extra_qt.dom.qt_dom import group, label, create_element
+
+N_ROWS = 2000
+
+
+class Row(Component):
+    def render(self):
+        return label(f'Row {self.props["i"]} {self.props["tick"]}')
+
+
+def rows(tick):
+    return group(dict(title='Rows'), [create_element(Row, dict(i=i, tick=tick)) for i in range(N_ROWS)])
+
+
+@pytest.mark.parametrize('profiling', [False, True], ids=['off', 'on'])
+def test_update(benchmark, dict_container, profiling):
+    ticks = iter(range(1, 10 ** 6))
+    render(rows(0), dict_container)
+
+    if profiling:
+        with profile():
+            benchmark(lambda: render(rows(next(ticks)), dict_container))
+    else:
+        benchmark(lambda: render(rows(next(ticks)), dict_container))
@@ -0,0 +1,20 @@
+"""
+Re-renders a dashboard of mostly static labels where only one label changes.
+"""
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label
+
+N_LABELS = 2000
+
+
+def dashboard(tick):
+    return group(dict(title='Dashboard'), [
+        label(f'Static {i}', dict(style='color: gray;')) for i in range(N_LABELS)
+    ] + [label(f'Tick {tick}')])
+
+
+def test_mostly_static_update(benchmark, qt_container):
+    render(dashboard(0), qt_container)
+    ticks = iter(range(1, 10 ** 6))
+
+    benchmark(lambda: render(dashboard(next(ticks)), qt_container))
@@ -0,0 +1,33 @@
+"""
+Re-renders a parent whose many children have stable props, with and without memoization.
+"""
+import pytest
+
+from extra_qt import render, Component, PureComponent
+from extra_qt.dom.qt_dom import group, label, create_element
+
+N_CHILDREN = 500
+
+
+class Row(Component):
+    def render(self):
+        return group(dict(title=self.props['title']), [
+            label(f'{self.props["title"]} {i}') for i in range(4)
+        ])
+
+
+class PureRow(PureComponent):
+    render = Row.render
+
+
+@pytest.mark.parametrize('row_cls', [Row, PureRow], ids=['component', 'pure'])
+def test_stable_children(benchmark, qt_container, row_cls):
+    def tree(tick):
+        return group(dict(title=f'Tick {tick}'), [
+            create_element(row_cls, dict(title=f'Row {i}')) for i in range(N_CHILDREN)
+        ])
+
+    render(tree(0), qt_container)
+    ticks = iter(range(1, 10 ** 6))
+
+    benchmark(lambda: render(tree(next(ticks)), qt_container))
@@ -0,0 +1,37 @@
+"""
+Sends 200 pure components a state update which changes nothing, as a polling data source
+does. Each component's state is a dict of 1000 readings. ``copy`` copies the state on every
+update as before, so the components compare it key by key, ``shared`` keeps the same state
+object, so they compare it by identity.
+"""
+import pytest
+
+from extra_qt import render, batched_updates, PureComponent
+from extra_qt.dom.qt_dom import group, label, create_element
+from extra_qt.renderers import renderer
+
+N_COMPONENTS = 200
+N_READINGS = 1000
+
+
+class Gauge(PureComponent):
+    initial_state = {f'sensor {i}': 0.0 for i in range(N_READINGS)}
+
+    def render(self):
+        return label(f'{self.props["i"]}: {self.state["sensor 0"]}')
+
+
+@pytest.mark.parametrize('kind', ['copy', 'shared'])
+def test_unchanged_updates(benchmark, dict_container, monkeypatch, kind):
+    if kind == 'copy':
+        monkeypatch.setattr(renderer, 'apply_changes', lambda state, changes: {**state, **changes})
+
+    render(group(dict(title='Gauges'), [create_element(Gauge, dict(i=i)) for i in range(N_COMPONENTS)]), dict_container)
+    gauges = [w.component for w in dict_container.rendered.wrapped_children]
+
+    def poll():
+        with batched_updates():
+            for gauge in gauges:
+                gauge.set_state({'sensor 0': 0.0})
+
+    benchmark(poll)
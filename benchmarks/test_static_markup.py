@@ -0,0 +1,32 @@
+"""
+Re-renders a form whose help panel of 500 labels never changes, with the panel built on
+every render and hoisted once with ``static``.
+"""
+import pytest
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, static
+
+N_HELP = 500
+
+
+def help_panel():
+    return group(dict(title='Help'), [label(f'Tip {i}: read the manual') for i in range(N_HELP)])
+
+
+HELP_PANEL = static(help_panel())
+
+
+def form(tick, hoisted):
+    return group(dict(title='Form'), [
+        HELP_PANEL if hoisted else help_panel(),
+        label(f'Saved {tick} times'),
+    ])
+
+
+@pytest.mark.parametrize('hoisted', [False, True], ids=['rebuilt', 'static'])
+def test_update(benchmark, dict_container, hoisted):
+    ticks = iter(range(1, 10 ** 6))
+    render(form(0, hoisted), dict_container)
+
+    benchmark(lambda: render(form(next(ticks), hoisted), dict_container))
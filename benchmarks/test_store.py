@@ -0,0 +1,52 @@
+"""
+Pushes one ticker update into a table of 200 rows. ``set_state`` keeps the prices in the
+state of the table component and re-renders it, ``store`` keeps them in a ``Store`` with
+each row connected to its own price.
+"""
+import pytest
+
+from extra_qt import render, batched_updates, Component, PureComponent, Store, connect
+from extra_qt.dom.qt_dom import group, label, create_element
+
+N_TICKERS = 200
+SYMBOLS = [f'T{i:03}' for i in range(N_TICKERS)]
+
+store = Store(dict(prices={s: 100.0 for s in SYMBOLS}))
+
+
+class Row(PureComponent):
+    def render(self):
+        return label(f'{self.props["symbol"]}: {self.props["price"]:.2f}')
+
+
+ConnectedRow = connect(store, lambda state, props: dict(price=state['prices'][props['symbol']]))(Row)
+
+
+class Table(Component):
+    initial_state = {s: 100.0 for s in SYMBOLS}
+
+    def render(self):
+        if self.props['source'] == 'store':
+            return group(dict(title='Tickers'), [create_element(ConnectedRow, dict(symbol=s, key=s)) for s in SYMBOLS])
+
+        return group(dict(title='Tickers'), [
+            create_element(Row, dict(symbol=s, price=self.state[s], key=s)) for s in SYMBOLS
+        ])
+
+
+@pytest.mark.parametrize('source', ['set_state', 'store'])
+def test_tick(benchmark, dict_container, source):
+    ticks = iter(range(1, 10 ** 6))
+    render(create_element(Table, dict(source=source)), dict_container)
+    table = dict_container.rendered.component
+
+    def tick():
+        i = next(ticks)
+        symbol, price = SYMBOLS[i % N_TICKERS], 100.0 + i
+        if source == 'store':
+            store.set(('prices', symbol), price)
+        else:
+            with batched_updates():
+                table.set_state({symbol: price})
+
+    benchmark(tick)
@@ -0,0 +1,37 @@
+"""
+Mounts a list of identically styled labels, with the style given as a stylesheet string
+(parsed per widget) and as a style object (compiled once and shared).
+"""
+import pytest
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, style
+from extra_qt.renderers.qt_renderer import widget_pool
+
+N_LABELS = 5000
+
+STYLES = {
+    'string': 'color: gray; padding: 2px;',
+    'object': style(color='gray', padding='2px'),
+}
+
+
+@pytest.mark.parametrize('kind', list(STYLES))
+def test_mount_styled_labels(benchmark, qt_app, qt_container, monkeypatch, kind):
+    monkeypatch.setattr(widget_pool, 'max_size', 0)
+    tree = group(dict(title='Labels'), [label(f'Label {i}', dict(style=STYLES[kind])) for i in range(N_LABELS)])
+
+    def setup():
+        container = QWidget()
+        container.setLayout(QVBoxLayout())
+        return (container,), {}
+
+    def mount(container):
+        render(tree, container)
+        container.show()
+        qt_app.processEvents()  # polish
+        container.hide()
+
+    benchmark.pedantic(mount, setup=setup, rounds=3)
@@ -0,0 +1,43 @@
+"""
+Re-renders a panel whose render function does a lot of formatting, with the render on the
+GUI thread and on a worker. ``extra_info['longest_stall_ms']`` is the longest the event loop
+went without processing events, which is what users notice as input lag.
+"""
+import time
+
+import pytest
+
+from extra_qt import render, Component, reconciler
+from extra_qt.dom.qt_dom import group, label, create_element
+
+N_READINGS = 20000
+
+
+class Telemetry(Component):
+    initial_state = 0
+
+    def render(self):
+        readings = [f'{(i * 7919 + self.state) % 1000 / 3:.3f}' for i in range(N_READINGS)]
+        return group(dict(title='Telemetry'), [label(' '.join(readings[i::10])) for i in range(10)])
+
+
+@pytest.mark.parametrize('threaded', [False, True], ids=['gui_thread', 'worker'])
+def test_heavy_render(benchmark, qt_app, qt_container, threaded):
+    reconciler.configure(threaded=threaded)
+    render(create_element(Telemetry), qt_container)
+    telemetry = qt_container.rendered.component
+    stalls = []
+
+    def update():
+        telemetry.set_state(telemetry.state + 1)
+        while True:
+            started = time.perf_counter()
+            qt_app.processEvents()
+            stalls.append(time.perf_counter() - started)
+
+            if not (reconciler.rendering or reconciler.flush_scheduled or reconciler.dirty_wrappers):
+                break
+
+    benchmark.pedantic(update, rounds=10)
+    benchmark.extra_info['longest_stall_ms'] = max(stalls) * 1000
+    reconciler.configure()
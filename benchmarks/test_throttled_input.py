@@ -0,0 +1,42 @@
+"""
+Drags a slider through 100 values, one per pass of the event loop, where every change
+sets state on a component rendering 200 labels. ``extra_info['renders']`` is how many
+times the panel rendered during the drag.
+"""
+import pytest
+
+from extra_qt import render, Component
+from extra_qt.dom.qt_dom import group, label, slider, create_element
+
+N_STEPS = 100
+N_LABELS = 200
+
+
+class Mixer(Component):
+    initial_state = 0
+    renders = 0
+
+    def render(self):
+        Mixer.renders += 1
+        return group(dict(title='Mixer'), [
+            slider(on_change=self.set_state, maximum=N_STEPS, **self.props),
+            *[label(f'Channel {i}: {self.state + i}') for i in range(N_LABELS)],
+        ])
+
+
+@pytest.mark.parametrize('limit', [{}, dict(on_change_throttle_ms=16)], ids=['unlimited', 'throttled'])
+def test_drag_slider(benchmark, qt_app, qt_container, limit):
+    render(create_element(Mixer, limit), qt_container)
+    w = qt_container.rendered.wrapped_child.wrapped_children[0].host_node
+
+    def drag():
+        Mixer.renders = 0
+        values = range(N_STEPS + 1) if w.value() == 0 else reversed(range(N_STEPS + 1))
+        for v in values:
+            w.setValue(v)
+            qt_app.processEvents()
+
+        return Mixer.renders
+
+    renders = benchmark.pedantic(drag, rounds=5)
+    benchmark.extra_info['renders'] = renders
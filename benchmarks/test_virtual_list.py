@@ -0,0 +1,22 @@
+"""
+Mounts a virtual list at increasing sizes. Mount time should not depend on the row count.
+"""
+import pytest
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, virtual_list
+
+
+@pytest.mark.parametrize('count', [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6])
+def test_mount_virtual_list(benchmark, qt_container, count):
+    tree = group(dict(title='Log'), [
+        virtual_list(count, lambda i: label(f'Line {i}'), row_height=20),
+    ])
+
+    def setup():
+        container = type(qt_container)()
+        container.setLayout(type(qt_container.layout())())
+        container.resize(400, 400)
+        return (tree, container), {}
+
+    benchmark.pedantic(render, setup=setup, rounds=5)
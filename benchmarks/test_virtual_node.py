@@ -0,0 +1,65 @@
+"""
+Creates markup with the slotted ``VirtualNode``, against the plain dataclass it replaced.
+Per-node memory is reported in ``extra_info``.
+"""
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional
+
+import pytest
+
+from extra_qt.dom.qt_dom import create_element, Group, Label
+from extra_qt.virtual_dom import TagType, VirtualNode
+
+N_NODES = 10 ** 4
+
+
+@dataclass
+class DataclassNode:
+    tag_type: Any = TagType.LABEL
+    children: Any = field(default_factory=list)
+    props: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[Hashable] = None
+
+
+def create_dataclass_element(tag_type, props=None, children=None):
+    # ``create_element`` as it was, allocating fresh props and children for every node
+    if props is None:
+        props = dict()
+
+    return DataclassNode(tag_type, props=props, children=children or [])
+
+
+FACTORIES = {
+    'dataclass': create_dataclass_element,
+    'slotted': create_element,
+}
+
+
+def markup(create):
+    return create(Group, None, [create(Label) for _ in range(N_NODES)])
+
+
+def bytes_per_node(create):
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        nodes = markup(create)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del nodes
+    return (after - before) / (N_NODES + 1)
+
+
+@pytest.mark.parametrize('kind', list(FACTORIES))
+def test_create_nodes(benchmark, kind):
+    create = FACTORIES[kind]
+    benchmark.extra_info['bytes_per_node'] = bytes_per_node(create)
+    benchmark(markup, create)
+
+
+def test_slotted_nodes_are_smaller():
+    assert bytes_per_node(create_element) < bytes_per_node(create_dataclass_element)
+    assert not hasattr(VirtualNode(), '__dict__')
@@ -0,0 +1,39 @@
+"""
+Toggles between a panel of styled labels and a button, with and without the widget pool.
+"""
+import pytest
+
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, button
+from extra_qt.renderers.qt_renderer import widget_pool
+
+N_LABELS = 500
+
+
+def view(show_panel):
+    if show_panel:
+        child = group(dict(title='Panel'), [
+            label(f'Label {i}', dict(style='color: gray; padding: 2px;')) for i in range(N_LABELS)
+        ])
+    else:
+        child = button(text='Show panel')
+
+    return group(dict(title='Root'), [child])
+
+
+@pytest.mark.parametrize('max_size', [0, 1024], ids=['no_pool', 'pool'])
+def test_toggle_views(benchmark, qt_container, max_size):
+    widget_pool.clear()
+    widget_pool.max_size = max_size
+    shown = [False]
+
+    def toggle():
+        shown[0] = not shown[0]
+        render(view(shown[0]), qt_container)
+
+    try:
+        render(view(False), qt_container)
+        benchmark(toggle)
+    finally:
+        widget_pool.clear()
+        widget_pool.max_size = 128
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture
+def qt_container(qt_app):
+    from PyQt5.QtWidgets import QWidget, QVBoxLayout
+    from extra_qt import reconciler
+
+    reconciler.configure()
+
+    container = QWidget()
+    container.setLayout(QVBoxLayout())
+    yield container
+
+
+@pytest.fixture
+def dict_container():
+    from extra_qt.renderers.dict_renderer import DictDOMWrapper, DictNode
+
+    DictDOMWrapper.use_as_renderer()
+    yield DictNode.container()
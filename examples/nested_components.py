@@ -2,20 +2,20 @@ from dataclasses import dataclass
 
 from PyQt5.QtCore import QTimer
 
-from extra_qt.component import Component
+from extra_qt.component import Component, PureComponent, evolve
 from extra_qt.renderers.qt_renderer import render_window
 from extra_qt.dom.qt_dom import *
 
 
-@dataclass
+@dataclass(frozen=True)
 class State:
     counter: int = 0
 
     def update(self):
-        self.counter += 5
+        return evolve(self, counter=self.counter + 5)
 
 
-class ComponentB(Component):
+class ComponentB(PureComponent):
     initial_state_cls = State
     update = Component.updates_state(State.update)
 
@@ -44,6 +44,7 @@ class ComponentA(Component):
             label(f'My count is: {self.state.counter}'),
             ComponentB.c(dict(counter=self.state.counter)),
             ComponentB.c(dict(counter=2 * self.state.counter)),
+            ComponentB.c(dict(counter='never changes, so never re-rendered by the timer')),
         ])
 
 
@@ -54,7 +54,7 @@ class SimpleComponent(Component):
             button(text='Zero', on_click=self.double if self.state.functions_swapped else self.reset),
             button(text='Swap', on_click=self.swap),
             *self.children,
-            label(str(self.state.counter), dict(style=f'color: {self.state.color};')),
+            label(str(self.state.counter), dict(style=style(color=self.state.color))),
             label('Full State: ' + str(self.state)),
 
             check_box(on_change=self.print),
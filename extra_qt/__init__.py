@@ -1,36 +1,28 @@
 """
 Essentially a tiny experimental port of React to Python to use Qt rendering.
+
+Importing the package does not import Qt. The virtual DOM, components, and the reconciler
+work without it, and the Qt renderer is loaded on first use, by ``render``,
+``reconciler.configure()``, or accessing one of the Qt names below.
 """
 
 __version__ = '0.1.0'
 
 
-from PyQt5.QtWidgets import QWidget
-
 from extra_qt.renderers.renderer import ComponentWrapper, WrapperT
 from extra_qt.virtual_dom import VirtualNode, TagType
-from extra_qt.component import Component
-from extra_qt.reconciler import reconciler
-
-
-def initial_render(element: VirtualNode, container: QWidget) -> QWidget:
-    instance = reconciler.wrap(element)
-    widget = reconciler.mount(instance, container)
-    container.rendered = instance
-
-    return widget
-
-
-def render(element: VirtualNode, container: QWidget):
-    try:
-        prev_component: WrapperT = container.rendered
-    except AttributeError:
-        return initial_render(element, container)
-
-    return update_from_root(prev_component, element)
+from extra_qt.component import Component, PureComponent, memo, evolve
+from extra_qt.reconciler import reconciler, batched_updates, profile, render, initial_render, update_from_root
+from extra_qt.hooks import use_state, use_memo, use_callback, use_effect, use_context
+from extra_qt.context import create_context
+from extra_qt.store import Store, connect
 
+_qt_names = {'render_window', 'QtDOMWrapper', 'MarkupFormat', 'widget_pool', 'style_registry'}
 
-def update_from_root(previous: WrapperT, element: VirtualNode):
-    return reconciler.receive(previous, element)
 
+def __getattr__(name):
+    if name in _qt_names:
+        from extra_qt.renderers import qt_renderer
+        return getattr(qt_renderer, name)
 
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,8 +1,90 @@
-from typing import Dict, Union, Any, Optional, Type
+import dataclasses
+from typing import Dict, Union, Any, Optional, Type, Callable, Mapping, TypeVar
 
 from extra_qt.dom.qt_dom import create_element
 from extra_qt.virtual_dom import ChildrenT, VirtualNode
 
+__all__ = ('Component', 'PureComponent', 'memo', 'shallow_equal', 'evolve',)
+
+S = TypeVar('S')
+
+
+def _same(a, b) -> bool:
+    return a is b or a == b
+
+
+def shallow_equal(a: Any, b: Any) -> bool:
+    """
+    Compares dicts by their values and lists by their items, without recursing any further.
+    Values are first compared by identity, so unchanged ``VirtualNode``s (or anything else
+    expensive to compare) are never compared structurally.
+    """
+    if a is b:
+        return True
+
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(v, b[k]) for k, v in a.items())
+
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+    if isinstance(a, VirtualNode) or isinstance(b, VirtualNode):
+        return False
+
+    return a == b
+
+
+def apply_changes(state: S, changes: Mapping[Any, Any]) -> S:
+    """
+    ``state``, a dict or dataclass, with ``changes`` applied as a new object. If every
+    change is to a value ``state`` already has, ``state`` itself is given back, so that
+    unchanged state can be recognized by identity.
+    """
+    if isinstance(state, dict):
+        if all(k in state and _same(state[k], v) for k, v in changes.items()):
+            return state
+
+        return {**state, **changes}
+
+    if all(_same(getattr(state, k), v) for k, v in changes.items()):
+        return state
+
+    return dataclasses.replace(state, **changes)
+
+
+def evolve(state: S, **changes) -> S:
+    """
+    Update immutable state, typically a frozen dataclass::
+
+        @dataclass(frozen=True)
+        class State:
+            count: int = 0
+
+            def increment(self):
+                return evolve(self, count=self.count + 1)
+
+    Gives back ``state`` itself when nothing changes, see ``apply_changes``.
+    """
+    return apply_changes(state, changes)
+
+
+def is_immutable(state: Any) -> bool:
+    return dataclasses.is_dataclass(state) and not isinstance(state, type) and state.__dataclass_params__.frozen
+
+
+def same_state(a: Any, b: Any) -> bool:
+    """
+    Immutable state only changes by being replaced, so it is compared by identity alone.
+    Other state is compared shallowly.
+    """
+    if a is b:
+        return True
+
+    if is_immutable(a) and is_immutable(b):
+        return False
+
+    return shallow_equal(a, b)
+
 
 class Component:
     props: Dict[Union[int, str], Any]
@@ -33,11 +115,15 @@ class Component:
 
     @staticmethod
     def updates_state(state_method):
+        """
+        Make a state method into a component method which updates state with it. The method
+        either updates state in place, or returns the new state, as for immutable state.
+        """
         def perform_set_state(self):
             def call_state_method(s):
                 bound_method = getattr(s, state_method.__name__)
-                bound_method()
-                return s
+                updated_state = bound_method()
+                return s if updated_state is None else updated_state
 
             self.set_state(call_state_method)
 
@@ -46,7 +132,7 @@ class Component:
     def set_state(self, latest_state):
         from extra_qt.reconciler import reconciler
         self.wrapper.pending_state.append(latest_state)
-        reconciler.update_if_necessary(self.wrapper)
+        reconciler.schedule_update(self.wrapper)
 
     def render(self) -> VirtualNode:
         raise NotImplementedError()
@@ -66,3 +152,49 @@ class Component:
     def before_unmount(self):
         pass
 
+
+
+class PureComponent(Component):
+    """
+    A component which only re-renders if its props, children, or state change, as
+    determined by a shallow comparison. Rendering is skipped entirely otherwise,
+    including reconciliation of everything it renders.
+
+    State should be replaced rather than mutated in order for this to be reliable. Updates
+    which mutate state in place and return it are assumed to change it. Immutable state,
+    such as frozen dataclasses updated with ``evolve``, is compared by identity alone.
+    """
+
+    def should_update(self, next_props, next_children, next_state):
+        return not (
+            shallow_equal(self.props, next_props) and
+            shallow_equal(self.children, next_children) and
+            same_state(self.state, next_state)
+        )
+
+
+def memo(component_cls: Type[Component],
+         are_equal: Optional[Callable[[Dict[str, Any], Dict[str, Any]], bool]] = None) -> Type[Component]:
+    """
+    Makes a version of ``component_cls`` which skips rendering when it receives equal props
+    and children and its state is unchanged. By default props are compared shallowly, but
+    ``are_equal(previous_props, next_props)`` can be provided to customize this.
+
+    Can be used as a decorator or around an existing component: ``MemoRow = memo(Row)``.
+    """
+    if are_equal is None:
+        are_equal = shallow_equal
+
+    def should_update(self, next_props, next_children, next_state):
+        return not (
+            are_equal(self.props, next_props) and
+            shallow_equal(self.children, next_children) and
+            same_state(self.state, next_state)
+        )
+
+    return type(component_cls.__name__, (component_cls,), {
+        'should_update': should_update,
+        '__module__': component_cls.__module__,
+        '__qualname__': component_cls.__qualname__,
+        '__doc__': component_cls.__doc__,
+    })
@@ -0,0 +1,117 @@
+"""
+Contexts share a value with everything rendered beneath a provider, without passing it
+down as props through every component in between::
+
+    prices = create_context({})
+
+    class App(Component):
+        def render(self):
+            return prices.provider(self.state, create_element(Table))
+
+    def Row(props, children):
+        price = use_context(prices, lambda p: p[props['symbol']])
+        return label(f'{props["symbol"]}: {price}')
+
+Consumers subscribe to the nearest provider with a selector. When the provided value
+changes, only consumers whose selected slice changed are updated, so components in between
+(a ``PureComponent`` ``Table`` above) are not rendered again.
+"""
+from typing import Any, Callable, Optional, Set
+
+from extra_qt.component import Component, shallow_equal
+from extra_qt.dom.qt_dom import create_element
+from extra_qt.reconciler import reconciler
+from extra_qt.virtual_dom import VirtualNode, normalize_children
+
+__all__ = ('Context', 'create_context',)
+
+
+def _identity(value):
+    return value
+
+
+class ContextHook:
+    """
+    A consumer's subscription to a provider, and the slice of the value it last rendered.
+    """
+    __slots__ = ('wrapper', 'provider', 'selector', 'selected',)
+
+
+class Provider(Component):
+    """
+    Provides ``props['value']`` for ``props['context']`` to its only child and everything
+    beneath it. Made with ``Context.provider``.
+    """
+    def __init__(self, props, children):
+        super().__init__(props, children)
+        self.subscriptions: Set[ContextHook] = set()
+
+    def before_receive_props(self, next_props, next_children):
+        value = next_props['value']
+        if value is self.props['value']:
+            return
+
+        for hook in self.subscriptions:
+            selected = hook.selector(value)
+            if not (selected is hook.selected or selected == hook.selected):
+                reconciler.schedule_update(hook.wrapper)
+
+    def should_update(self, next_props, next_children, next_state):
+        # consumers of the value are updated through their subscriptions
+        return not shallow_equal(self.children, next_children)
+
+    def render(self) -> VirtualNode:
+        child, = normalize_children(self.children)
+        return child
+
+
+class Context:
+    def __init__(self, default: Any = None):
+        self.default = default
+
+    def provider(self, value: Any, child: VirtualNode) -> VirtualNode:
+        return create_element(Provider, dict(context=self, value=value), [child])
+
+    def consumer(self, render: Callable[[Any], VirtualNode],
+                 selector: Optional[Callable[[Any], Any]] = None) -> VirtualNode:
+        """
+        Markup rendered by ``render(selected)``, for use inside class components.
+        """
+        return create_element(Consumer, dict(context=self, render=render, selector=selector))
+
+    def find_provider(self, wrapper) -> Optional[Provider]:
+        ancestor = wrapper.parent
+        while ancestor is not None:
+            component = getattr(ancestor, 'component', None)
+            if isinstance(component, Provider) and component.props['context'] is self:
+                return component
+
+            ancestor = ancestor.parent
+
+        return None
+
+    def subscribe(self, hook: ContextHook, selector: Optional[Callable[[Any], Any]]) -> Any:
+        """
+        Select from the value of ``hook``'s provider, or from the default if there is none.
+        """
+        hook.selector = selector or _identity
+        value = self.default if hook.provider is None else hook.provider.props['value']
+        hook.selected = hook.selector(value)
+        return hook.selected
+
+    @staticmethod
+    def unsubscribe(hook: ContextHook):
+        if hook.provider is not None:
+            hook.provider.subscriptions.discard(hook)
+
+
+def create_context(default: Any = None) -> Context:
+    """
+    A context whose consumers see ``default`` when there is no provider above them.
+    """
+    return Context(default)
+
+
+def Consumer(props, children):
+    from extra_qt.hooks import use_context
+    return props['render'](use_context(props['context'], props['selector']))
@@ -1,6 +1,8 @@
-from typing import Type, Union
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import Type, Union, Callable
 
-from extra_qt.virtual_dom import TagType, VirtualNode
+from extra_qt.virtual_dom import TagType, VirtualNode, VirtualStyleSettings, StaticNode, EMPTY_PROPS, EMPTY_CHILDREN
 
 __all__ = (
     'create_element',
@@ -15,18 +17,28 @@ __all__ = (
     'Slider', 'slider',
     'TextEdit', 'text_edit',
     'Dial', 'dial',
+    'VirtualList', 'virtual_list',
+    'ListView', 'list_view',
+    'style',
+    'static', 'hoist',
 )
 
 
-def create_element(tag_type: Union[TagType, Type['Component']], props=None, children=None) -> VirtualNode:
+def create_element(tag_type: Union[TagType, Type['Component'], Callable[..., VirtualNode]],
+                   props=None, children=None) -> VirtualNode:
     if isinstance(props, (list, str)):
         children = props
         props = {}
 
-    if props is None:
-        props = dict()
+    key = None
+    if not props:
+        props = EMPTY_PROPS
+    elif 'key' in props:
+        # ``key`` belongs to the reconciler and is not passed through as a prop
+        props = dict(props)
+        key = props.pop('key')
 
-    return VirtualNode(tag_type, props=props, children=children or [])
+    return VirtualNode(tag_type, children or EMPTY_CHILDREN, props or EMPTY_PROPS, key)
 
 
 def _bind_create(tag):
@@ -54,6 +66,8 @@ LineEdit = TagType.LINE_EDIT
 Dial = TagType.DIAL
 Slider = TagType.SLIDER
 TextEdit = TagType.TEXT_EDIT
+VirtualList = TagType.VIRTUAL_LIST
+ListView = TagType.LIST_VIEW
 
 button = _bind_create_input(Button)
 group = _bind_create(Group)
@@ -65,9 +79,75 @@ line_edit = _bind_create_input(LineEdit)
 dial = _bind_create_input(Dial)
 slider = _bind_create_input(Slider)
 text_edit = _bind_create_input(TextEdit)
+list_view = _bind_create_input(ListView)
 
 
 def label(text, props=None, children=None):
     props = props or {}
     props['text'] = text
-    return create_element(Label, props, [])
\ No newline at end of file
+    return create_element(Label, props)
+
+
+def virtual_list(count: int, render_row: Callable[[int], VirtualNode], row_height: int = 24,
+                 overscan: int = 5, props=None):
+    """
+    A scrolling list of ``count`` rows, where ``render_row(i)`` gives the markup for row ``i``.
+    Only the rows in view (plus ``overscan`` extra) are ever rendered, and their widgets are
+    reused for other rows as the list scrolls, so very long lists cost no more than short ones.
+
+    ``row_height`` is an estimate in pixels used to decide how many rows fit in view.
+    """
+    props = dict(props or {})
+    props.update(count=count, render_row=render_row, row_height=row_height, overscan=overscan)
+    return create_element(VirtualList, props, [])
+
+
+def style(**declarations) -> VirtualStyleSettings:
+    """
+    A shareable style, ``style(color='gray', font_size='12px')``. Prefer these to stylesheet
+    strings for styles repeated across many elements, see ``StyleRegistry``.
+    """
+    return VirtualStyleSettings.of(**declarations)
+
+
+def static(element: VirtualNode) -> StaticNode:
+    """
+    Constant markup, such as headings or a fixed panel, which is created once and then
+    rendered again and again::
+
+        HEADER = static(group(dict(title='Settings'), [label('Changes apply at once')]))
+
+        def render(self):
+            return group([HEADER, ...])
+
+    Gives a read-only copy of ``element`` and everything beneath it. Reconciling the same
+    static node again is skipped entirely, rather than diffing the whole subtree.
+    """
+    if isinstance(element, StaticNode):
+        return element
+
+    children = element.children
+    if isinstance(children, VirtualNode):
+        children = static(children)
+    elif isinstance(children, (list, tuple)):
+        children = tuple(static(child) for child in children)
+
+    props = element.props if element.props is EMPTY_PROPS else MappingProxyType(dict(element.props))
+    return StaticNode(element.tag_type, children or EMPTY_CHILDREN, props, element.key)
+
+
+def hoist(build: Callable[..., VirtualNode]) -> Callable[..., StaticNode]:
+    """
+    Cache the markup built by ``build`` as ``static`` markup, per arguments, which must be
+    hashable. The markup of the 128 most recently used arguments is kept::
+
+        @hoist
+        def section_header(title):
+            return group(dict(title=title), [label('...')])
+    """
+    @lru_cache(maxsize=128)
+    @wraps(build)
+    def build_static(*args, **kwargs):
+        return static(build(*args, **kwargs))
+
+    return build_static
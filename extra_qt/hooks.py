@@ -0,0 +1,189 @@
+"""
+Function components and their hooks. A function component is a plain function
+``fn(props, children) -> VirtualNode``, used like any component class::
+
+    def Counter(props, children):
+        count, set_count = use_state(0)
+        increment = use_callback(lambda: set_count(lambda c: c + 1), ())
+        return button(text=f'{props["name"]}: {count}', on_click=increment)
+
+    render(create_element(Counter, dict(name='Clicks')), container)
+
+There is no component instance. Whatever a function component keeps between renders lives
+in its wrapper's ``hooks``, one slot per hook call, so hooks must be called in the same
+order on every render and never conditionally.
+"""
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from extra_qt.context import Context, ContextHook
+from extra_qt.reconciler import reconciler
+from extra_qt.virtual_dom import VirtualNode
+
+__all__ = ('use_state', 'use_memo', 'use_callback', 'use_effect', 'use_context',)
+
+T = TypeVar('T')
+DepsT = Optional[Tuple[Any, ...]]
+
+
+class StateHook:
+    __slots__ = ('value', 'set_value',)
+
+
+class MemoHook:
+    __slots__ = ('deps', 'value',)
+
+
+class EffectHook:
+    __slots__ = ('deps', 'cleanup',)
+
+
+class _Rendering:
+    """
+    The function component being rendered, and how many hooks it has called so far.
+    """
+    wrapper = None
+    index = 0
+
+
+_rendering = _Rendering()
+
+
+def _next_hook(hook_cls: type):
+    wrapper = _rendering.wrapper
+    if wrapper is None:
+        raise RuntimeError('Hooks can only be called while rendering a function component')
+
+    hooks: List[Any] = wrapper.hooks
+    i = _rendering.index
+    _rendering.index += 1
+
+    if i == len(hooks):
+        hook = hook_cls()
+        hooks.append(hook)
+        return wrapper, hook, True
+
+    hook = hooks[i]
+    if type(hook) is not hook_cls:
+        raise RuntimeError(f'{wrapper.element.tag_type.__name__} called its hooks in a different order than '
+                           f'on its previous render, hooks must not be called conditionally')
+
+    return wrapper, hook, False
+
+
+def _deps_changed(previous: DepsT, latest: DepsT) -> bool:
+    if previous is None or latest is None or len(previous) != len(latest):
+        return True
+
+    return not all(a is b or a == b for a, b in zip(previous, latest))
+
+
+def render_with_hooks(wrapper) -> VirtualNode:
+    """
+    Apply the state updates made since the last render and call the function component.
+    """
+    if wrapper.pending_state:
+        pending_state, wrapper.pending_state = wrapper.pending_state, []
+        for hook, update in pending_state:
+            hook.value = update(hook.value) if callable(update) else update
+
+    outer_wrapper, outer_index = _rendering.wrapper, _rendering.index
+    _rendering.wrapper = wrapper
+    _rendering.index = 0
+    try:
+        element = wrapper.element
+        return element.tag_type(element.props, element.children)
+    finally:
+        _rendering.wrapper = outer_wrapper
+        _rendering.index = outer_index
+
+
+def unmount_hooks(wrapper):
+    for hook in wrapper.hooks:
+        if type(hook) is EffectHook and hook.cleanup is not None:
+            cleanup, hook.cleanup = hook.cleanup, None
+            cleanup()
+        elif type(hook) is ContextHook:
+            Context.unsubscribe(hook)
+
+
+def use_state(initial: Any) -> Tuple[Any, Callable[[Any], None]]:
+    """
+    State which is kept between renders, with a function to update it. Updates are either
+    the next value or a function from the current value to the next, and are rendered like
+    ``Component.set_state``. If ``initial`` is callable it is called on the first render
+    to compute the initial value. The update function is the same on every render.
+    """
+    wrapper, hook, is_new = _next_hook(StateHook)
+    if is_new:
+        hook.value = initial() if callable(initial) else initial
+
+        def set_value(update):
+            wrapper.pending_state.append((hook, update))
+            reconciler.schedule_update(wrapper)
+
+        hook.set_value = set_value
+
+    return hook.value, hook.set_value
+
+
+def use_memo(compute: Callable[[], T], deps: DepsT = None) -> T:
+    """
+    The result of ``compute()``, computed again only when an item of ``deps`` changes.
+    Without ``deps`` it is computed on every render.
+    """
+    _, hook, is_new = _next_hook(MemoHook)
+    if is_new or _deps_changed(hook.deps, deps):
+        hook.value = compute()
+        hook.deps = deps
+
+    return hook.value
+
+
+def use_callback(callback: T, deps: DepsT = None) -> T:
+    """
+    ``callback`` as it was when ``deps`` last changed, so handlers passed down keep their
+    identity between renders and don't cause needless updates.
+    """
+    return use_memo(lambda: callback, deps)
+
+
+def use_effect(effect: Callable[[], Optional[Callable[[], None]]], deps: DepsT = None):
+    """
+    Call ``effect()`` once the render has been committed to the host, on the first render
+    and whenever an item of ``deps`` changes, or on every render without ``deps``. The
+    effect may return a cleanup function, which is called before the effect runs again and
+    when the component is unmounted.
+    """
+    wrapper, hook, is_new = _next_hook(EffectHook)
+    if is_new:
+        hook.cleanup = None
+    elif not _deps_changed(hook.deps, deps):
+        return
+
+    hook.deps = deps
+
+    def run_effect():
+        if hook.cleanup is not None:
+            cleanup, hook.cleanup = hook.cleanup, None
+            cleanup()
+
+        if not reconciler.is_discarded(wrapper):
+            hook.cleanup = effect()
+
+    reconciler.after_commit(run_effect)
+
+
+def use_context(context: Context, selector: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    ``selector(value)`` for the value of the nearest provider of ``context``, or the whole
+    value without a selector. The component is rendered again when the provided value
+    changes such that the selected slice differs (by ``==``), see ``extra_qt.context``.
+    """
+    wrapper, hook, is_new = _next_hook(ContextHook)
+    if is_new:
+        hook.wrapper = wrapper
+        hook.provider = context.find_provider(wrapper)
+        if hook.provider is not None:
+            hook.provider.subscriptions.add(hook)
+
+    return context.subscribe(hook, selector)
@@ -0,0 +1,223 @@
+"""
+Host mutations as data. Wrappers make all changes to the host tree through
+``reconciler.effect(wrapper.method, *args)``, which records them as ``Mutation``s. Deferred
+mutations are coalesced before they are applied, and any mutation can be described as
+plain, serializable operations for metrics and tests, see ``MutationLog``.
+"""
+import json
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from extra_qt.virtual_dom import TagType
+
+__all__ = ('Mutation', 'MutationLog', 'coalesce_mutations',)
+
+
+class Mutation(NamedTuple):
+    """
+    ``getattr(target, op)(*args)``, or ``target(*args)`` for an ``op`` of ``'call'``.
+    """
+    op: str
+    target: Any
+    args: tuple = ()
+
+    @classmethod
+    def of(cls, fn: Callable, args: tuple) -> 'Mutation':
+        target = getattr(fn, '__self__', None)
+        if target is None:
+            return cls('call', fn, args)
+
+        return cls(fn.__name__, target, args)
+
+    @property
+    def name(self) -> str:
+        if self.op == 'call':
+            return getattr(self.target, '__qualname__', type(self.target).__name__)
+
+        return f'{type(self.target).__name__}.{self.op}'
+
+    def apply(self):
+        if self.op == 'call':
+            self.target(*self.args)
+        else:
+            getattr(self.target, self.op)(*self.args)
+
+
+def coalesce_mutations(mutations: List[Mutation]) -> List[Mutation]:
+    """
+    Merge repeated property updates of the same node, which happen when a wrapper is
+    reconciled more than once before a deferred commit. The merged update takes the place
+    of the first, going from the props before the first to the props after the last.
+    """
+    first_update: Dict[int, int] = {}
+    coalesced: List[Optional[Mutation]] = []
+
+    for mutation in mutations:
+        if mutation.op != 'update_properties':
+            coalesced.append(mutation)
+            continue
+
+        i = first_update.get(id(mutation.target))
+        if i is None:
+            first_update[id(mutation.target)] = len(coalesced)
+            coalesced.append(mutation)
+        else:
+            previous, _ = coalesced[i].args
+            _, latest = mutation.args
+            coalesced[i] = mutation._replace(args=(previous, latest))
+
+    return coalesced
+
+
+def host_of(wrapper):
+    # components have no host node of their own, they stand for the one they render
+    while wrapper is not None and not isinstance(wrapper.element.tag_type, TagType):
+        wrapper = wrapper.wrapped_child
+
+    return wrapper
+
+
+def host_parent_of(wrapper):
+    parent = wrapper.parent
+    while parent is not None and not isinstance(parent.element.tag_type, TagType):
+        parent = parent.parent
+
+    return parent
+
+
+class MutationLog:
+    """
+    Records host mutations as they are applied, as flat operations on numbered host nodes::
+
+        {'op': 'set_prop', 'node': 3, 'prop': 'text', 'value': 'Row 1'}
+
+    Operations are ``create``, ``insert_before``, ``reorder``, ``replace``, ``remove``,
+    ``set_prop``, ``remove_prop``, ``connect_handler`` and ``call`` (for effects which are
+    not wrapper methods). Mounting a subtree creates and inserts each of its nodes in turn,
+    and components are logged as the host node they render. Nodes are numbered in the order
+    the log first sees them, so that logs are deterministic. Record with
+    ``reconciler.record_mutations()``, and replay with ``DictDOMWrapper.replay``.
+
+    Operations are kept in the order they were applied. They are not reordered for
+    locality, as inserts are placed relative to siblings which earlier operations put there.
+    """
+    def __init__(self):
+        self.operations: List[Dict[str, Any]] = []
+        self.node_ids: Dict[int, int] = {}
+        self.nodes: List[Any] = []  # keeps numbered wrappers alive, so their ids are not reused
+        self.replaced: Optional[int] = None  # the node being replaced, until the replacement is mounted
+
+    def node_id(self, wrapper) -> Optional[int]:
+        wrapper = host_of(wrapper)
+        if wrapper is None:
+            return None
+
+        node_id = self.node_ids.get(id(wrapper))
+        if node_id is None:
+            node_id = self.node_ids[id(wrapper)] = len(self.nodes)
+            self.nodes.append(wrapper)
+
+        return node_id
+
+    def create(self, wrapper) -> Dict[str, Any]:
+        from extra_qt.reconciler import wrapper_name
+        wrapper = host_of(wrapper)
+        return dict(op='create', node=self.node_id(wrapper), tag=wrapper_name(wrapper), props={
+            k: v for k, v in wrapper.element.props.items() if not callable(v)
+        })
+
+    def describe_tree(self, wrapper) -> List[Dict[str, Any]]:
+        """
+        Create the mounted subtree of ``wrapper``, leaving its root to be inserted.
+        """
+        host = host_of(wrapper)
+        operations = [self.create(host)]
+        for child in host.wrapped_children:
+            operations.extend(self.describe_tree(child))
+            operations.append(dict(op='insert_before', parent=self.node_id(host), node=self.node_id(child), before=None))
+
+        return operations
+
+    def describe(self, mutation: Mutation) -> List[Dict[str, Any]]:
+        """
+        The operations for ``mutation`` before it is applied. Mounts are described once they
+        are applied, see ``describe_mounted``.
+        """
+        from extra_qt.renderers.renderer import changed_props
+        op, target, args = mutation
+
+        if op == 'update_properties':
+            previous, latest = args
+            node = self.node_id(target)
+            return [
+                dict(op='connect_handler', node=node, prop=k) if callable(latest.props.get(k)) else
+                dict(op='set_prop', node=node, prop=k, value=latest.props[k]) if k in latest.props else
+                dict(op='remove_prop', node=node, prop=k)
+                for k in sorted(changed_props(previous.props, latest.props), key=str)
+            ]
+
+        if op == 'mount_child':
+            return []
+
+        if op == 'move_before':
+            sibling, = args
+            return [dict(
+                op='insert_before', parent=self.node_id(host_parent_of(target)),
+                node=self.node_id(target), before=self.node_id(sibling),
+            )]
+
+        if op == 'reorder_children':
+            wrappers, = args
+            return [dict(op='reorder', parent=self.node_id(target), nodes=[self.node_id(w) for w in wrappers])]
+
+        if op == 'replace_child':
+            self.replaced = self.node_id(target.wrapped_child)
+            return []
+
+        if op == 'unmount':
+            instance, = args
+            return [dict(op='remove', node=self.node_id(instance))]
+
+        return [dict(op='call', name=mutation.name)]
+
+    def describe_mounted(self, mutation: Mutation) -> List[Dict[str, Any]]:
+        """
+        The operations for a mount once it has been applied, when the mounted subtree exists.
+        """
+        op, target, args = mutation
+
+        if op == 'mount_child':
+            wrapper, _, next_sibling = args
+            return self.describe_tree(wrapper) + [dict(
+                op='insert_before', parent=self.node_id(target),
+                node=self.node_id(wrapper), before=self.node_id(next_sibling),
+            )]
+
+        if op == 'replace_child':
+            replaced, self.replaced = self.replaced, None
+            return self.describe_tree(target.wrapped_child) + [dict(
+                op='replace', node=replaced, by=self.node_id(target.wrapped_child),
+            )]
+
+        return []
+
+    def record(self, mutation: Mutation):
+        self.operations.extend(self.describe(mutation))
+
+    def record_mounted(self, mutation: Mutation):
+        self.operations.extend(self.describe_mounted(mutation))
+
+    def record_tree(self, wrapper):
+        """
+        Record mounting the tree of ``wrapper`` into the root container, which is the
+        ``None`` parent. Record this before anything else to replay a log from scratch.
+        """
+        self.operations.extend(self.describe_tree(wrapper))
+        self.operations.append(dict(op='insert_before', parent=None, node=self.node_id(wrapper), before=None))
+
+    def counts(self) -> Counter:
+        return Counter(operation['op'] for operation in self.operations)
+
+    def to_json(self) -> str:
+        # prop values which JSON can't represent, like style objects, are given by their repr
+        return json.dumps(self.operations, default=repr)
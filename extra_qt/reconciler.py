@@ -1,44 +1,621 @@
-from typing import Type, Any
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Type, Any, Callable, Dict, Optional, List, Tuple, Set, ContextManager
 
+from extra_qt.mutations import Mutation, MutationLog, coalesce_mutations
 from extra_qt.virtual_dom import VirtualNode, TagType
 
-__all__ = ('reconciler',)
+__all__ = ('reconciler', 'batched_updates', 'profile', 'Profiler', 'render', 'initial_render', 'update_from_root',)
 
 WrapperT = Type['WrapperT']
 HostNode = Any
 
+# A unit of work: reconcile the wrapper against new markup. If the markup is None,
+# the wrapper is re-rendered against its current markup, provided it is still dirty.
+WorkT = Tuple[WrapperT, Optional[VirtualNode]]
+
+
+def wrapper_name(wrapper: WrapperT) -> str:
+    tag_type = wrapper.element.tag_type
+    return tag_type.name if isinstance(tag_type, TagType) else tag_type.__name__
+
+
+@dataclass
+class ComponentStats:
+    renders: int = 0
+    wasted_renders: int = 0  # renders which gave back the same markup as before
+    inclusive: float = 0.0  # seconds, including everything rendered beneath
+    exclusive: float = 0.0
+
+
+@dataclass
+class _Frame:
+    wrapper: WrapperT
+    name: str
+    category: str
+    started: float
+    credited: Set[str]  # names whose inclusive time already covers this frame
+    children: float = 0.0
+
+
+class Profiler:
+    """
+    Records where the reconciler spends its time, per component (or host tag):
+
+    * how often it rendered, and how many of those renders gave back unchanged markup
+    * time spent reconciling it, on its own (exclusive) and with everything beneath it (inclusive)
+    * host mutations per commit and host nodes created and destroyed
+
+    Install one with ``reconciler.profile()``. Results are available as a text
+    ``summary()`` and as a Chrome trace (``write_trace``), which Perfetto also opens.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stats: Dict[str, ComponentStats] = defaultdict(ComponentStats)
+
+        self.mutations = 0  # since the last commit
+        self.commits: List[int] = []  # mutations in each commit
+        self.nodes_created = 0
+        self.nodes_destroyed = 0
+
+        self.events: List[Dict[str, Any]] = []
+        self.frames: List[_Frame] = []
+
+    def _event(self, name: str, category: str, started: float, ended: float, **args):
+        self.events.append(dict(
+            name=name, cat=category, ph='X', pid=os.getpid(), tid=threading.get_ident(),
+            ts=(started - self.started) * 1e6, dur=(ended - started) * 1e6, args=args,
+        ))
+
+    def enter(self, wrapper: WrapperT, category: str):
+        name = wrapper_name(wrapper)
+        if self.frames:
+            credited = self.frames[-1].credited | {name}
+        else:
+            # the work loop is flat, so our ancestors were reconciled in earlier frames
+            credited = set()
+            ancestor = wrapper
+            while ancestor is not None:
+                credited.add(wrapper_name(ancestor))
+                ancestor = ancestor.parent
+
+        self.frames.append(_Frame(wrapper, name, category, time.perf_counter(), credited))
+
+    def exit(self):
+        ended = time.perf_counter()
+        frame = self.frames.pop()
+        elapsed = ended - frame.started
+
+        stats = self.stats[frame.name]
+        stats.exclusive += elapsed - frame.children
+        if self.frames:
+            outer = self.frames[-1]
+            outer.children += elapsed
+            credited = frame.credited - outer.credited
+        else:
+            credited = frame.credited
+
+        for name in credited:
+            self.stats[name].inclusive += elapsed
+
+        self._event(frame.name, frame.category, frame.started, ended)
+
+    def render(self, wrapper: WrapperT) -> VirtualNode:
+        element = wrapper.render()
+
+        stats = self.stats[wrapper_name(wrapper)]
+        stats.renders += 1
+        previous = wrapper.wrapped_child
+        if previous is not None and previous.element == element:
+            stats.wasted_renders += 1
+
+        return element
+
+    def mount(self, instance: WrapperT, container, index: Optional[int]):
+        if isinstance(instance.element.tag_type, TagType):
+            self.nodes_created += 1
+
+        self.enter(instance, 'mount')
+        try:
+            return instance.mount(container, index)
+        finally:
+            self.exit()
+
+    def unmount(self, instance: WrapperT, container):
+        if isinstance(instance.element.tag_type, TagType):
+            self.nodes_destroyed += 1
+
+        self.enter(instance, 'unmount')
+        try:
+            return instance.unmount(container)
+        finally:
+            self.exit()
+
+    def apply_effect(self, mutation: Mutation):
+        self.mutations += 1
+
+        started = time.perf_counter()
+        try:
+            mutation.apply()
+        finally:
+            self._event(mutation.name, 'effect', started, time.perf_counter())
+
+    def end_commit(self):
+        if self.mutations:
+            self.commits.append(self.mutations)
+            self.mutations = 0
+
+    def trace(self) -> Dict[str, Any]:
+        return dict(traceEvents=self.events, displayTimeUnit='ms')
+
+    def write_trace(self, path: str):
+        """
+        Write a Chrome trace, which can be opened in chrome://tracing or ui.perfetto.dev.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+    def summary(self) -> str:
+        lines = [
+            f'{"component":<32} {"renders":>8} {"wasted":>8} {"incl. ms":>10} {"excl. ms":>10}',
+        ]
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1].inclusive):
+            lines.append(
+                f'{name:<32} {stats.renders:>8} {stats.wasted_renders:>8} '
+                f'{stats.inclusive * 1000:>10.2f} {stats.exclusive * 1000:>10.2f}'
+            )
+
+        commits = self.commits or [0]
+        lines += [
+            '',
+            f'commits: {len(self.commits)}, host mutations per commit: '
+            f'mean {sum(commits) / len(commits):.1f}, max {max(commits)}',
+            f'host nodes created: {self.nodes_created}, destroyed: {self.nodes_destroyed}',
+        ]
+        return '\n'.join(lines)
+
 
 class Reconciler:
     host_wrapper_cls: Type['HostWrapper'] = None
     host_node_cls: Any = None
 
-    def configure(self, host_wrapper_cls=None, host_node_cls=None):
-        from .renderers.qt_renderer import QWidget, QtDOMWrapper
+    # How to defer a flush of pending updates until the host's event loop comes around.
+    # If this is not set, state updates are flushed immediately.
+    schedule_flush: Optional[Callable[[Callable[[], None]], None]] = None
+
+    # If set, state updates are reconciled in slices of at most this many seconds, yielding
+    # to the event loop in between. Host mutations are held back and committed together
+    # at the end, so that the UI never shows a partially applied update.
+    frame_budget: Optional[float] = None
+
+    # If set, state updates are reconciled on this executor instead of the host's thread. The
+    # host mutations are collected and committed on the host's thread, by passing the commit
+    # to ``call_on_host_thread``.
+    render_executor: Optional[Executor] = None
+    call_on_host_thread: Optional[Callable[[Callable[[], None]], None]] = None
+
+    # Once a commit has made this many host mutations, repaints of the host are held back
+    # until the commit is done, so that a large update is painted once at the end.
+    suspend_updates_after: int = 64
+
+    # Set while recording mutations, see ``record_mutations``.
+    mutation_log: Optional[MutationLog] = None
+
+    # Set while profiling, see ``profile``. Every hook checks this first, so that
+    # reconciling without a profiler costs no more than that check.
+    profiler: Optional[Profiler] = None
+
+    def __init__(self):
+        self.dirty_wrappers: Dict[int, WrapperT] = {}
+        self.batch_depth = 0
+        self.is_flushing = False
+        self.flush_scheduled = False
+
+        self.work_stack: List[WorkT] = []  # work left over from a previous slice
+        self.pending_effects: List[Mutation] = []
+        self.effects: Optional[List[Mutation]] = None  # where effects go, if deferred
+
+        self.rendering: Optional[Future] = None  # reconciliation running on the render executor
+
+        self.mutations = 0  # host mutations in the current commit
+        self.updates_suspended: Optional[ContextManager] = None
+        self.committed_callbacks: List[Callable[[], None]] = []
+
+    def configure(self, host_wrapper_cls=None, host_node_cls=None, schedule_flush=None,
+                  incremental=False, frame_budget_ms=8.0, threaded=False):
+        """
+        Set up the render target. By default state updates are reconciled in one go. With
+        ``incremental=True`` they are reconciled in slices of ``frame_budget_ms`` so that
+        large updates do not block input handling.
+
+        With ``threaded=True`` state updates are reconciled on a worker thread, and only
+        committed on the GUI thread. Components must then not touch widgets while rendering.
+        """
+        from .renderers.qt_renderer import QWidget, QtDOMWrapper, schedule_on_event_loop, call_on_gui_thread
         self.host_wrapper_cls = host_wrapper_cls or QtDOMWrapper
         self.host_node_cls = host_node_cls or QWidget
+        self.schedule_flush = schedule_flush or schedule_on_event_loop
+        self.frame_budget = frame_budget_ms / 1000 if incremental else None
+
+        if self.render_executor is not None:
+            self.finish_work()
+            self.render_executor.shutdown()
+            self.render_executor = None
 
-    def wrap(self, element) -> WrapperT:
-        from extra_qt.renderers.renderer import ComponentWrapper
+        if threaded:
+            self.render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extra-qt-render')
+            self.call_on_host_thread = call_on_gui_thread
+
+    def wrap(self, element, parent: WrapperT = None) -> WrapperT:
+        from extra_qt.renderers.renderer import ComponentWrapper, FunctionWrapper
         if isinstance(element.tag_type, TagType):
-            return self.host_wrapper_cls(element)
+            wrapper = self.host_wrapper_cls(element)
+        elif isinstance(element.tag_type, type):
+            wrapper = ComponentWrapper(element)
+        else:
+            wrapper = FunctionWrapper(element)
 
-        return ComponentWrapper(element)
+        if parent is not None:
+            wrapper.parent = parent
+            wrapper.depth = parent.depth + 1
 
-    @staticmethod
-    def mount(instance: WrapperT, container: HostNode) -> HostNode:
-        return instance.mount(container)
+        return wrapper
 
-    @staticmethod
-    def unmount(instance: WrapperT, container: HostNode = None):
-        return instance.unmount(container, container)
+    def mount(self, instance: WrapperT, container: HostNode, index: int = None) -> HostNode:
+        if self.profiler is not None:
+            return self.profiler.mount(instance, container, index)
 
-    @staticmethod
-    def receive(instance: WrapperT, latest: VirtualNode) -> HostNode:
-        instance.receive(latest)
+        return instance.mount(container, index)
+
+    def unmount(self, instance: WrapperT, container: HostNode = None):
+        if self.profiler is not None:
+            return self.profiler.unmount(instance, container)
+
+        return instance.unmount(container)
+
+    def render(self, instance: WrapperT) -> VirtualNode:
+        """
+        Render the component of ``instance``.
+        """
+        if self.profiler is not None:
+            return self.profiler.render(instance)
+
+        return instance.render()
+
+    def discard(self, instance: WrapperT):
+        """
+        Unmount ``instance`` as part of reconciling its parent. The unmount itself may be
+        deferred to the commit, so the wrapper is flagged straight away so that no further
+        updates are rendered inside it in the meantime.
+        """
+        instance.is_discarded = True
+        self.effect(self.unmount, instance)
 
     @staticmethod
-    def update_if_necessary(instance: WrapperT):
-        instance.update_if_necessary()
+    def is_discarded(instance: WrapperT) -> bool:
+        while instance is not None:
+            if instance.is_discarded:
+                return True
+
+            instance = instance.parent
+
+        return False
+
+    def receive(self, instance: WrapperT, latest: VirtualNode):
+        self.perform_update([(instance, latest)])
+
+    def update_if_necessary(self, instance: WrapperT):
+        self.perform_update([(instance, None)])
+
+    def perform_update(self, work: List[WorkT]):
+        # an interrupted update was reconciled against older markup, it has to land first
+        self.finish_work()
+
+        self.batch_depth += 1
+        try:
+            self.perform_work(work)
+        finally:
+            self.batch_depth -= 1
+            self.end_commit()
+
+        # wrappers scheduled while reconciling, like context consumers, are part of this update
+        if self.dirty_wrappers and not self.batch_depth and not self.is_flushing:
+            self.flush_updates()
+
+    def finish_work(self):
+        """
+        Complete and commit an incremental update which was interrupted between slices,
+        or is being reconciled on the render executor.
+        """
+        if self.rendering is not None:
+            wait([self.rendering])
+            self.commit_rendered()
+
+        if self.work_stack and not self.is_flushing:
+            self.flush_updates(interruptible=False)
+
+    def effect(self, fn: Callable, *args):
+        """
+        Perform a host mutation. Wrappers route all changes to the host tree through here
+        while reconciling, so that they can be deferred to a commit phase.
+        """
+        mutation = Mutation.of(fn, args)
+        if self.effects is not None:
+            self.effects.append(mutation)
+        else:
+            self.apply_effect(mutation)
+
+    def apply_effect(self, mutation: Mutation):
+        self.mutations += 1
+        if self.mutations == self.suspend_updates_after:
+            self.updates_suspended = self.host_wrapper_cls.suspend_updates()
+            self.updates_suspended.__enter__()
+
+        if self.mutation_log is not None:
+            self.mutation_log.record(mutation)
+
+        if self.profiler is None:
+            mutation.apply()
+        else:
+            self.profiler.apply_effect(mutation)
+
+        if self.mutation_log is not None:
+            self.mutation_log.record_mounted(mutation)
+
+    def perform_work(self, work: List[WorkT], deadline: float = None) -> List[WorkT]:
+        """
+        Reconcile depth first, starting from ``work``. Each wrapper reconciles only itself
+        and hands back the work for its children, so the walk can be stopped between any two
+        wrappers. Returns whatever work is left if ``deadline`` passes.
+        """
+        stack = list(reversed(work))
+        while stack:
+            wrapper, element = stack.pop()
+            if element is None:
+                if not wrapper.is_dirty or self.is_discarded(wrapper):
+                    continue  # already rendered by a parent, or on its way out
+            elif element.is_static and element is wrapper.element:
+                continue  # constant markup which is already displayed
+
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.enter(wrapper, 'update')
+
+            try:
+                if element is None:
+                    child_work = wrapper.update_if_necessary()
+                else:
+                    child_work = wrapper.receive(element)
+            finally:
+                if profiler is not None:
+                    profiler.exit()
+
+            stack.extend(reversed(child_work))
+
+            # checked after the unit, so that every slice makes progress however small the budget
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+        stack.reverse()
+        return stack
+
+    def commit(self):
+        effects, self.pending_effects = self.pending_effects, []
+        try:
+            self.host_wrapper_cls.apply_mutations(coalesce_mutations(effects))
+        finally:
+            self.end_commit()
+
+    def end_commit(self):
+        """
+        Called once all host mutations of an update have been made.
+        """
+        self.mutations = 0
+        if self.updates_suspended is not None:
+            suspended, self.updates_suspended = self.updates_suspended, None
+            suspended.__exit__(None, None, None)
+
+        if self.profiler is not None:
+            self.profiler.end_commit()
+
+        # swap first, callbacks may update state and so commit again
+        callbacks, self.committed_callbacks = self.committed_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback: Callable[[], None]):
+        """
+        Call ``callback`` once the update being reconciled has been committed to the host.
+        """
+        self.committed_callbacks.append(callback)
+
+    def schedule_update(self, instance: WrapperT):
+        """
+        Mark ``instance`` as needing to re-render. Updates are coalesced: however many times
+        a wrapper is scheduled before the next flush, it renders once.
+        """
+        instance.is_dirty = True
+        self.dirty_wrappers[id(instance)] = instance
+
+        if self.batch_depth or self.is_flushing:
+            return  # picked up at the end of the batch or by the flush in progress
+
+        if self.schedule_flush is None:
+            self.flush_updates()
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.schedule_flush(self.flush_updates)
+
+    def flush_updates(self, interruptible: bool = True):
+        """
+        Render everything that is dirty. Wrappers are rendered parents first, so that a child
+        which is re-rendered by its parent consumes its pending state there and is skipped here.
+
+        If a frame budget is configured and runs out, the remaining work is picked up
+        on the next pass of the event loop and nothing is committed until it is finished.
+        """
+        if self.render_executor is not None and interruptible:
+            return self.flush_on_executor()
+
+        self.flush_scheduled = False
+        self.is_flushing = True
+
+        deadline = None
+        if self.frame_budget is not None:
+            if interruptible:
+                deadline = time.perf_counter() + self.frame_budget
+
+            self.effects = self.pending_effects
+
+        try:
+            while self.dirty_wrappers or self.work_stack:
+                if not self.work_stack:
+                    if self.pending_effects:
+                        # wrappers mounted by the finished work only exist once it is committed,
+                        # so updates which came in meanwhile are rendered after the commit
+                        break
+
+                    dirty = sorted(self.dirty_wrappers.values(), key=lambda w: w.depth)
+                    self.dirty_wrappers = {}
+                    self.work_stack = [(wrapper, None) for wrapper in dirty]
+
+                self.work_stack = self.perform_work(self.work_stack, deadline)
+                if self.work_stack:
+                    self.flush_scheduled = True
+                    self.schedule_flush(self.flush_updates)
+                    return
+        except BaseException:
+            self.end_commit()
+            raise
+        finally:
+            self.effects = None
+            self.is_flushing = False
+
+        self.commit()
+
+        if self.dirty_wrappers and not self.flush_scheduled:
+            if interruptible:
+                self.flush_scheduled = True
+                self.schedule_flush(self.flush_updates)
+            else:
+                self.flush_updates(interruptible=False)
+
+    def flush_on_executor(self):
+        self.flush_scheduled = False
+        if self.rendering is not None:
+            return  # flushed again once the render in progress is committed
+
+        dirty = sorted(self.dirty_wrappers.values(), key=lambda w: w.depth)
+        self.dirty_wrappers = {}
+
+        # state updates made meanwhile only mark their wrappers as dirty, see ``schedule_update``
+        self.is_flushing = True
+        self.effects = self.pending_effects
+        self.rendering = self.render_executor.submit(self.perform_work, [(wrapper, None) for wrapper in dirty])
+        self.rendering.add_done_callback(lambda _: self.call_on_host_thread(self.commit_rendered))
+
+    def commit_rendered(self):
+        """
+        Commit the host mutations collected on the render executor, on the host's thread.
+        """
+        rendering, self.rendering = self.rendering, None
+        if rendering is None:
+            return  # already committed by ``finish_work``
+
+        self.effects = None
+        self.is_flushing = False
+        try:
+            rendering.result()
+        except BaseException:
+            self.pending_effects = []
+            raise
+
+        self.commit()
+        if self.dirty_wrappers:
+            self.flush_updates()
+
+    @contextmanager
+    def batched_updates(self):
+        """
+        Defer all state updates inside the block and render once when it exits::
+
+            with batched_updates():
+                for row in rows:
+                    row.set_state(...)
+        """
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth and not self.is_flushing:
+                self.flush_updates()
+
+    @contextmanager
+    def profile(self, profiler: Optional[Profiler] = None):
+        """
+        Profile everything rendered inside the block::
+
+            with profile() as profiler:
+                render(...)
+
+            print(profiler.summary())
+            profiler.write_trace('render.json')
+        """
+        profiler = profiler or Profiler()
+        previous, self.profiler = self.profiler, profiler
+        try:
+            yield profiler
+        finally:
+            self.profiler = previous
+
+    @contextmanager
+    def record_mutations(self, log: Optional[MutationLog] = None):
+        """
+        Log the host mutations applied inside the block, see ``MutationLog``.
+        """
+        log = log or MutationLog()
+        previous, self.mutation_log = self.mutation_log, log
+        try:
+            yield log
+        finally:
+            self.mutation_log = previous
+
+
+reconciler = Reconciler()
+batched_updates = reconciler.batched_updates
+profile = reconciler.profile
+
+
+def initial_render(element: VirtualNode, container: HostNode) -> HostNode:
+    if reconciler.host_wrapper_cls is None:
+        reconciler.configure()  # Qt is only loaded once something is rendered
+
+    instance = reconciler.wrap(element)
+    try:
+        widget = reconciler.mount(instance, container)
+    finally:
+        reconciler.end_commit()
+
+    container.rendered = instance
+
+    return widget
+
+
+def render(element: VirtualNode, container: HostNode):
+    try:
+        prev_component: WrapperT = container.rendered
+    except AttributeError:
+        return initial_render(element, container)
+
+    return update_from_root(prev_component, element)
 
 
-reconciler = Reconciler()
\ No newline at end of file
+def update_from_root(previous: WrapperT, element: VirtualNode):
+    return reconciler.receive(previous, element)
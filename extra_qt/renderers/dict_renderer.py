@@ -0,0 +1,163 @@
+"""
+A headless render target which renders to nested dicts. This is useful for tests and
+benchmarks, where we want to exercise the reconciler without a display server or the
+overhead of constructing widgets.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from extra_qt.reconciler import reconciler, WorkT
+from extra_qt.virtual_dom import VirtualNode, TagType, normalize_children
+from .renderer import HostWrapper, WrapperT, changed_props
+
+__all__ = ('DictDOMWrapper', 'DictNode',)
+
+
+class DictNode(dict):
+    """
+    A rendered element, ``{'tag': TagType, 'props': {...}, 'children': [DictNode, ...]}``.
+
+    This is a plain dict subclass so that it compares and prints like a dict literal, but it
+    can also act as a render root, which needs a ``.rendered`` attribute.
+    """
+
+    @classmethod
+    def container(cls) -> 'DictNode':
+        return cls(tag=None, props={}, children=[])
+
+
+def index_of(nodes: List[DictNode], node: DictNode) -> int:
+    # search by identity, equal nodes are not interchangeable. We search from the back because
+    # children are unmounted (and so removed from their parent) in reverse order.
+    for i in range(len(nodes) - 1, -1, -1):
+        if nodes[i] is node:
+            return i
+
+    raise ValueError('node is not a child of its container')
+
+
+@dataclass
+class DictDOMWrapper(HostWrapper):
+    element: VirtualNode
+
+    host_node: DictNode = None
+    host_container: DictNode = None
+    wrapped_children: List[WrapperT] = field(default_factory=list)
+    parent: Optional[WrapperT] = field(default=None, repr=False, compare=False)
+    depth: int = 0
+    is_discarded: bool = False
+
+    def receive(self, element: VirtualNode) -> List[WorkT]:
+        return self.update(self.element, element)
+
+    def update(self, previous: VirtualNode, latest: VirtualNode) -> List[WorkT]:
+        if previous is not latest and previous.props != latest.props:
+            reconciler.effect(self.update_properties, previous, latest)
+
+        work = []
+        if self.element.tag_type not in {TagType.BUTTON, TagType.LABEL, }:
+            work = self.update_children(previous, latest)
+
+        self.element = latest
+
+        return work
+
+    def update_properties(self, previous: VirtualNode, latest: VirtualNode):
+        props = self.host_node['props']
+        for k in changed_props(previous.props, latest.props):
+            if k in latest.props:
+                props[k] = latest.props[k]
+            else:
+                del props[k]
+
+    def index_in_container(self) -> int:
+        return index_of(self.host_container['children'], self.host_node)
+
+    def move_before(self, sibling: Optional[WrapperT]):
+        children = self.host_container['children']
+        del children[self.index_in_container()]
+
+        index = len(children) if sibling is None else sibling.index_in_container()
+        children.insert(index, self.host_node)
+
+    def reorder_children(self, wrappers: List[WrapperT]):
+        self.host_node['children'] = [wrapper.host_node for wrapper in wrappers]
+
+    def unmount(self, container: DictNode = None):
+        if container is None:
+            container = self.host_container
+
+        for wrapper in reversed(self.wrapped_children):
+            reconciler.unmount(wrapper, self.host_node)
+
+        del container['children'][index_of(container['children'], self.host_node)]
+
+    def mount(self, container: DictNode, index: int = None):
+        self.host_container = container
+        self.host_node = DictNode(tag=self.element.tag_type, props=dict(self.element.props), children=[])
+
+        if index is None:
+            container['children'].append(self.host_node)
+        else:
+            container['children'].insert(index, self.host_node)
+
+        for child in normalize_children(self.element.children):
+            wrapper = reconciler.wrap(child, self)
+            self.wrapped_children.append(wrapper)
+            reconciler.mount(wrapper, self.host_node)
+
+        return self.host_node
+
+    @staticmethod
+    def replay(operations: Iterable[Dict[str, Any]], container: DictNode) -> DictNode:
+        """
+        Apply the operations of a ``MutationLog`` to ``container``, which stands for the root
+        container of the log (the ``None`` parent). The log must create every node it uses,
+        see ``MutationLog.record_tree``. Operations may have been through JSON, but handlers
+        and callbacks can't be, so ``connect_handler`` and ``call`` are skipped.
+        """
+        nodes: Dict[Optional[int], DictNode] = {None: container}
+        parents: Dict[int, DictNode] = {}
+
+        for operation in operations:
+            op, node_id = operation['op'], operation.get('node')
+
+            if op == 'create':
+                nodes[node_id] = DictNode(tag=TagType[operation['tag']], props=dict(operation['props']), children=[])
+            elif op == 'insert_before':
+                node, parent = nodes[node_id], nodes[operation['parent']]
+                previous_parent = parents.get(node_id)
+                if previous_parent is not None:
+                    del previous_parent['children'][index_of(previous_parent['children'], node)]
+
+                children = parent['children']
+                before = operation['before']
+                children.insert(len(children) if before is None else index_of(children, nodes[before]), node)
+                parents[node_id] = parent
+            elif op == 'reorder':
+                nodes[operation['parent']]['children'] = [nodes[child_id] for child_id in operation['nodes']]
+            elif op == 'replace':
+                parent = parents.pop(node_id)
+                children = parent['children']
+                children[index_of(children, nodes[node_id])] = nodes[operation['by']]
+                parents[operation['by']] = parent
+            elif op == 'remove':
+                parent = parents.pop(node_id)
+                del parent['children'][index_of(parent['children'], nodes[node_id])]
+            elif op == 'set_prop':
+                nodes[node_id]['props'][operation['prop']] = operation['value']
+            elif op == 'remove_prop':
+                del nodes[node_id]['props'][operation['prop']]
+
+        return container
+
+    @classmethod
+    def use_as_renderer(cls):
+        """
+        Render to dicts. There is no event loop to defer to, so state updates are
+        reconciled immediately.
+        """
+        reconciler.host_wrapper_cls = cls
+        reconciler.host_node_cls = DictNode
+        reconciler.schedule_flush = None
+        reconciler.frame_budget = None
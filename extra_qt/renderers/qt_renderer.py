@@ -1,16 +1,20 @@
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Callable, Optional, Union, Tuple, Any
+from functools import lru_cache
+from typing import List, Dict, Callable, Optional, Union, Tuple, Any, Set, Deque, Hashable
 
-from extra_qt import render
-from extra_qt.reconciler import reconciler
-from extra_qt.virtual_dom import VirtualNode, TagType
-from .renderer import HostWrapper, WrapperT
+from extra_qt.reconciler import reconciler, render, WorkT
+from extra_qt.virtual_dom import VirtualNode, TagType, normalize_children, child_key
+from .renderer import HostWrapper, WrapperT, changed_props
 
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QAbstractListModel, QModelIndex
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QGroupBox, QPushButton, QMainWindow, QApplication, QTabWidget, \
-    QCheckBox, QSpinBox, QLineEdit, QDial, QSlider, QTextEdit, QComboBox
+    QCheckBox, QSpinBox, QLineEdit, QDial, QSlider, QTextEdit, QComboBox, QHBoxLayout, QScrollBar, QSizePolicy, \
+    QListView
 
-__all__ = ('QtDOMWrapper', 'render_window', 'MarkupFormat',)
+__all__ = ('QtDOMWrapper', 'render_window', 'MarkupFormat', 'widget_pool', 'style_registry',)
 
 
 class MarkupFormat(Enum):
@@ -19,19 +23,115 @@ class MarkupFormat(Enum):
     MARKDOWN = 2
 
 
+class StyleRegistry:
+    """
+    Applies style objects (``VirtualStyleSettings``) without giving each widget a stylesheet
+    of its own, which Qt would parse and polish separately for every widget.
+
+    Each distinct style is compiled once and gets a name, which is set on its widgets as the
+    ``STYLE_PROPERTY`` dynamic property. One rule per style, selected by that property, goes
+    into a stylesheet on the application. New rules are installed together on the next pass
+    of the event loop, as every change to the application stylesheet re-polishes all widgets.
+
+    Plain string styles may contain selectors, so they are still set on each widget.
+
+    Rules are never removed, as we can't tell when the last widget using a style is gone, and
+    each new rule re-polishes the whole application. That pays off for styles which are
+    repeated, but not for data driven ones, like a color for every value of a reading. So at
+    most ``max_styles`` styles are registered, and any style beyond those is set on each of
+    its widgets as a stylesheet of its own, as plain string styles are.
+    """
+    STYLE_PROPERTY = 'extraQtStyle'
+    max_styles = 256
+
+    def __init__(self):
+        self.names: Dict[Hashable, str] = {}
+        self.rules: List[str] = []
+        self.base_stylesheet = ''  # the application's own stylesheet, which we append to
+        self.installed: Optional[str] = None
+        self.install_scheduled = False
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile(style: Hashable) -> str:
+        return style.to_stylesheet()
+
+    def register(self, style: Hashable) -> Optional[str]:
+        """
+        The name of ``style``, or None if the registry is full and the style isn't in it.
+        """
+        name = self.names.get(style)
+        if name is None:
+            if len(self.names) >= self.max_styles:
+                return None
+
+            name = self.names[style] = f's{len(self.names)}'
+            self.rules.append(f'*[{self.STYLE_PROPERTY}="{name}"] {{ {self.compile(style)} }}')
+
+            if not self.install_scheduled:
+                self.install_scheduled = True
+                QTimer.singleShot(0, self.install)
+
+        return name
+
+    def install(self):
+        self.install_scheduled = False
+        app = QApplication.instance()
+        if app is None:
+            return
+
+        if app.styleSheet() != self.installed:
+            self.base_stylesheet = app.styleSheet()  # changed by someone else since
+
+        self.installed = '\n'.join([self.base_stylesheet] + self.rules)
+        app.setStyleSheet(self.installed)
+
+    def apply(self, w: QWidget, style: Optional[Hashable]):
+        name = None if style is None else self.register(style)
+        w.setProperty(self.STYLE_PROPERTY, name)
+
+        has_local_style = style is not None and name is None
+        if has_local_style:
+            w.setStyleSheet(self.compile(style))
+        elif getattr(w, 'has_local_style', False):
+            w.setStyleSheet('')
+
+        w.has_local_style = has_local_style
+
+
+style_registry = StyleRegistry()
+
+
 def set_style(w: QWidget, style: any):
-    if style is not None:
-        if not isinstance(style, str):
-            w.setStyleSheet(style.to_stylesheet())
-        else:
-            w.setStyleSheet(style)
+    if style is None:
+        return
+
+    if isinstance(style, str):
+        w.setStyleSheet(style)
+    else:
+        style_registry.apply(w, style)
 
 
 def update_style(w: QWidget, previous_style: any, next_style: any):
     if previous_style == next_style:
         return
 
-    set_style(w, next_style or '{}')
+    is_registered = not isinstance(previous_style, (str, type(None))) or \
+        not isinstance(next_style, (str, type(None)))
+
+    if isinstance(previous_style, str) and not isinstance(next_style, str):
+        w.setStyleSheet('')
+
+    if is_registered:
+        style_registry.apply(w, None if isinstance(next_style, str) else next_style)
+
+    if isinstance(next_style, str):
+        w.setStyleSheet(next_style)
+
+    if is_registered:
+        # polished widgets don't notice that the property changed
+        w.style().unpolish(w)
+        w.style().polish(w)
 
 
 def noop(*_, **__):
@@ -45,6 +145,127 @@ def noop_build(cls):
     return builder
 
 
+class RateLimit:
+    """
+    Holds back calls to the handler ``handlers[handler_name]``, set with the props
+    ``<handler>_throttle_ms`` and ``<handler>_debounce_ms``. Calls which are held back are
+    coalesced, and the handler is later called once with the latest arguments.
+
+    Throttled handlers are called at once, then at most once per ``throttle_ms``. Debounced
+    handlers are called once the signal has been quiet for ``debounce_ms``, so a debounce of
+    0 coalesces the signals emitted in one pass of the event loop.
+    """
+    def __init__(self, w: QWidget, handlers: Dict[str, Optional[Callable]], handler_name: str):
+        self.handlers = handlers
+        self.handler_name = handler_name
+        self.throttle_ms: Optional[int] = None
+        self.debounce_ms: Optional[int] = None
+        self.pending_args: Optional[tuple] = None
+
+        self.timer = QTimer(w)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.timeout)
+
+    def configure(self, throttle_ms: Optional[int], debounce_ms: Optional[int]):
+        self.throttle_ms = throttle_ms
+        self.debounce_ms = debounce_ms
+
+    def call(self, args: tuple):
+        if self.debounce_ms is not None:
+            self.pending_args = args
+            self.timer.start(self.debounce_ms)
+        elif self.timer.isActive():
+            self.pending_args = args
+        else:
+            self.dispatch(args)
+            self.timer.start(self.throttle_ms)
+
+    def timeout(self):
+        if self.pending_args is None:
+            return
+
+        args, self.pending_args = self.pending_args, None
+        self.dispatch(args)
+        if self.debounce_ms is None:
+            self.timer.start(self.throttle_ms)
+
+    def dispatch(self, args: tuple):
+        handler = self.handlers[self.handler_name]
+        if handler is not None:
+            handler(*args)
+
+    def flush(self):
+        self.timer.stop()
+        self.timeout()
+        self.timer.stop()
+
+    def cancel(self):
+        self.timer.stop()
+        self.pending_args = None
+
+
+def trampoline(handlers: Dict[str, Optional[Callable]], rate_limits: Dict[str, RateLimit],
+               handler_name: str) -> Callable:
+    def dispatch(*args):
+        rate_limit = rate_limits.get(handler_name)
+        if rate_limit is not None:
+            rate_limit.call(args)
+            return
+
+        handler = handlers[handler_name]
+        if handler is not None:
+            handler(*args)
+
+    return dispatch
+
+
+def rate_limit_props(handler_name: str) -> Tuple[str, str]:
+    return f'{handler_name}_throttle_ms', f'{handler_name}_debounce_ms'
+
+
+def set_rate_limit(w: QWidget, handler_name: str, props):
+    throttle_prop, debounce_prop = rate_limit_props(handler_name)
+    throttle_ms, debounce_ms = props.get(throttle_prop), props.get(debounce_prop)
+
+    rate_limit = w.rate_limits.get(handler_name)
+    if throttle_ms is None and debounce_ms is None:
+        if rate_limit is not None:
+            # calls which were held back still go out, so the latest value isn't lost
+            del w.rate_limits[handler_name]
+            rate_limit.flush()
+        return
+
+    if rate_limit is None:
+        rate_limit = w.rate_limits[handler_name] = RateLimit(w, w.handlers, handler_name)
+
+    rate_limit.configure(throttle_ms, debounce_ms)
+
+
+def cancel_rate_limits(w: QWidget):
+    for rate_limit in getattr(w, 'rate_limits', {}).values():
+        rate_limit.cancel()
+
+
+def connect_handlers(w: QWidget, signal_map: Dict[str, Tuple[Any, str]], props):
+    """
+    Each signal is connected once, when the widget is built, to a slot which calls whatever
+    handler is currently in ``w.handlers``. Handlers are often created anew on every render,
+    and swapping one is then a dict write rather than a disconnect and connect in Qt.
+    Handlers with a throttle or debounce prop are called through a ``RateLimit``.
+    """
+    w.handlers = handlers = {}
+    w.rate_limits = rate_limits = {}
+    for signal_name, (arg, handler_name) in signal_map.items():
+        handlers[handler_name] = props.get(handler_name)
+        set_rate_limit(w, handler_name, props)
+
+        signal = getattr(w, signal_name)
+        if arg is not None:
+            signal = signal[arg]
+
+        signal.connect(trampoline(handlers, rate_limits, handler_name))
+
+
 def set_widget_style_and_signals(**signal_map: Dict[str, Union[Tuple[Any, str], str]]):
     """
     Example of how signals and slots are treated:
@@ -55,7 +276,12 @@ def set_widget_style_and_signals(**signal_map: Dict[str, Union[Tuple[Any, str],
     @set_..._signals(pressed='on_click')) <->
          widget.pressed.connect(props['on_click'])
 
-    with some extra safety. This is also the behavior on the update decorator.
+    except that the signal is connected to a trampoline which calls the latest handler,
+    see ``connect_handlers``. The update decorator only swaps the handler.
+
+    Every handler can be rate limited with ``<handler>_throttle_ms`` or
+    ``<handler>_debounce_ms`` props, e.g. ``slider(on_change=..., on_change_throttle_ms=50)``,
+    see ``RateLimit``.
     """
     signal_map: Dict[str, Tuple[Any, str]] = {
         signal_name: (None, slot_name) if isinstance(slot_name, str) else slot_name
@@ -69,16 +295,7 @@ def set_widget_style_and_signals(**signal_map: Dict[str, Union[Tuple[Any, str],
         def wrapped_build(props, children):
             w = build(props, children)
             set_style(w, props.get('style'))
-
-            for signal_name, (arg, handler_name) in signal_map.items():
-                if handler_name in props:
-                    signal = getattr(w, signal_name)
-
-                    if arg is not None:
-                        signal = signal[arg]
-
-                    signal.connect(props[handler_name])
-
+            connect_handlers(w, signal_map, props)
             return w
 
         return wrapped_build
@@ -86,6 +303,13 @@ def set_widget_style_and_signals(**signal_map: Dict[str, Union[Tuple[Any, str],
 
 
 def update_widget_style_and_signals(**signal_map):
+    """
+    The counterpart of ``set_widget_style_and_signals`` for updates. The decorated updater
+    is called as ``updater(w, previous, latest, changed)`` where ``changed`` is the set of
+    prop names which differ between renders. The updater is not called at all if
+    nothing changed, and should only call the setters for props in ``changed``, since every
+    setter call crosses into Qt and may trigger a relayout.
+    """
     signal_map = {
         signal_name: (None, slot_name) if isinstance(slot_name, str) else slot_name
         for signal_name, slot_name in signal_map.items()
@@ -96,20 +320,21 @@ def update_widget_style_and_signals(**signal_map):
             updater = noop
 
         def wrapped_update(w: QWidget, previous: VirtualNode, latest: VirtualNode):
-            updater(w, previous, latest)
-            update_style(w, previous.props.get('style'), latest.props.get('style'))
+            changed = changed_props(previous.props, latest.props)
+            if not changed:
+                return
+
+            updater(w, previous, latest, changed)
 
-            for signal_name, (arg, handler_name) in signal_map.items():
-                p_handler, l_handler = previous.props.get(handler_name), latest.props.get(handler_name)
-                if p_handler != l_handler:
-                    signal = getattr(w, signal_name)
-                    if arg is not None:
-                        signal = signal[arg]
+            if 'style' in changed:
+                update_style(w, previous.props.get('style'), latest.props.get('style'))
 
-                    if p_handler:
-                        signal.disconnect(p_handler)
+            for _, handler_name in signal_map.values():
+                if handler_name in changed:
+                    w.handlers[handler_name] = latest.props.get(handler_name)
 
-                    signal.connect(l_handler)
+                if not changed.isdisjoint(rate_limit_props(handler_name)):
+                    set_rate_limit(w, handler_name, latest.props)
 
         return wrapped_update
 
@@ -133,14 +358,19 @@ def build_button(props, children):
     return QPushButton(props.get('text', ''))
 
 
+def build_tab_page() -> QWidget:
+    page = QWidget()
+    page.setLayout(QVBoxLayout())
+    return page
+
+
 def build_tabs(props, children):
     w = QTabWidget()
 
+    # a page for each child, the children are mounted onto them by the ``QtDOMWrapper``
     labels = props.get('labels', [])
-    for p in labels:
-        tab = QWidget()
-        tab.setLayout(QVBoxLayout())
-        w.addTab(tab, p)
+    for i in range(len(normalize_children(children))):
+        w.addTab(build_tab_page(), labels[i] if i < len(labels) else '')
 
     selected = props.get('selected')
     if isinstance(selected, str):
@@ -157,35 +387,198 @@ def build_check_box(props, children):
     return QCheckBox(props.get('title', ''))
 
 
+class ListModel(QAbstractListModel):
+    """
+    The items of a combo box or list view, as ``(text, value)`` pairs, where the value is the
+    item's ``Qt.UserRole`` data. ``set_items`` applies a change to the list as the fewest row
+    insertions and removals it can, so that views keep their selection and scroll position,
+    and falls back to a single model reset when most of the list is replaced.
+    """
+    def __init__(self, items: List[Tuple[str, Any]] = ()):
+        super().__init__()
+        self.items = list(items)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        text, value = self.items[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return text
+
+        if role == Qt.UserRole:
+            return value
+
+        return None
+
+    def set_items(self, items: List[Tuple[str, Any]]):
+        items, old = list(items), self.items
+
+        # only the rows between the unchanged head and tail of the list are touched
+        start = 0
+        while start < min(len(old), len(items)) and old[start] == items[start]:
+            start += 1
+
+        old_end, end = len(old), len(items)
+        while old_end > start and end > start and old[old_end - 1] == items[end - 1]:
+            old_end, end = old_end - 1, end - 1
+
+        removed, inserted = old_end - start, end - start
+        if removed == inserted:
+            if removed:
+                self.items[start:old_end] = items[start:end]
+                self.dataChanged.emit(self.index(start), self.index(end - 1))
+        elif removed and inserted and max(removed, inserted) > len(items) // 2:
+            self.beginResetModel()
+            self.items = items
+            self.endResetModel()
+        else:
+            if removed:
+                self.beginRemoveRows(QModelIndex(), start, old_end - 1)
+                del self.items[start:old_end]
+                self.endRemoveRows()
+
+            if inserted:
+                self.beginInsertRows(QModelIndex(), start, end - 1)
+                self.items[start:start] = items[start:end]
+                self.endInsertRows()
+
+
+def list_items(props) -> List[Tuple[str, Any]]:
+    keys = props.get('keys', [])
+    return list(zip(keys, props.get('values', [None] * len(keys))))
+
+
 @set_widget_style_and_signals(activated=(str, 'on_change'))
 def build_combo_box(props, children):
     w = QComboBox()
-    keys = props.get('keys')
-    values = props.get('values', [None] * len(keys))
+    w.setModel(ListModel(list_items(props)))
+    return w
 
-    for k, v in zip(keys, values):
-        w.addItem(k, v)
 
-    return w
+class ListViewWidget(QListView):
+    """
+    A list view which reports the text of the current item through ``item_selected``.
+    """
+    item_selected = pyqtSignal(str)
 
+    def __init__(self, model: ListModel):
+        super().__init__()
+        self.setModel(model)
+        self.setUniformItemSizes(True)  # lets the view skip measuring every row
+        self.selectionModel().currentChanged.connect(self.emit_item_selected)
 
-@set_widget_style_and_signals()
+    def emit_item_selected(self, current: QModelIndex, _previous: QModelIndex):
+        if current.isValid():
+            self.item_selected.emit(current.data())
+
+
+@set_widget_style_and_signals(item_selected='on_change')
+def build_list_view(props, children):
+    return ListViewWidget(ListModel(list_items(props)))
+
+
+class TextEdit(QTextEdit):
+    """
+    A text edit which reports its text, in ``text_format``, through ``text_edited``.
+    """
+    text_edited = pyqtSignal(str)
+
+    def __init__(self, text_format: MarkupFormat):
+        super().__init__()
+        self.text_format = text_format
+        self.textChanged.connect(self.emit_text_edited)
+
+    def emit_text_edited(self):
+        # QTextEdit.textChanged is just a notifier, so we read the text ourselves
+        if self.handlers['on_change'] is None:
+            return
+
+        if self.text_format == MarkupFormat.TEXT:
+            self.text_edited.emit(self.toPlainText())
+        elif self.text_format == MarkupFormat.HTML:
+            self.text_edited.emit(self.toHtml())
+        elif self.text_format == MarkupFormat.MARKDOWN:
+            self.text_edited.emit(self.toMarkdown())
+
+
+@set_widget_style_and_signals(text_edited='on_change')
 def build_text_edit(props, children):
-    w = QTextEdit()
-    handler = props.get('on_change')
-    format = props.get('format', MarkupFormat.TEXT)
+    return TextEdit(props.get('format', MarkupFormat.TEXT))
+
+
+class VirtualListWidget(QWidget):
+    """
+    Shows a window of rows onto a long list, with a scroll bar standing in for the rest of it.
+    The rows themselves are managed by the ``QtDOMWrapper``, which is told to re-render them
+    through ``window_changed`` whenever the window moves or changes size.
+
+    Only the GUI thread may read the widget, so the wrapper takes a ``viewport`` when the
+    window changes and renders the rows from that, wherever the reconcile runs.
+    """
+    window_changed = pyqtSignal()
+
+    def __init__(self, row_height: int, overscan: int):
+        super().__init__()
+        self.row_height = row_height
+        self.overscan = overscan
+        self.count = 0
+
+        # the rows we render depend on the height of the body, so its height must not
+        # depend on the rows or every resize would render more rows
+        self.body = QWidget()
+        self.body.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Ignored)
+        self.body.setMinimumHeight(row_height)
+        body_layout = QVBoxLayout()
+        body_layout.setContentsMargins(0, 0, 0, 0)
+        body_layout.setSpacing(0)
+        body_layout.setAlignment(Qt.AlignTop)
+        self.body.setLayout(body_layout)
+
+        self.scroll_bar = QScrollBar(Qt.Vertical)
+        self.scroll_bar.valueChanged.connect(self.window_changed.emit)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.body)
+        layout.addWidget(self.scroll_bar)
+        self.setLayout(layout)
+
+    @property
+    def rows_in_view(self) -> int:
+        return max(1, -(-self.body.height() // max(1, self.row_height)))
+
+    def viewport(self) -> Tuple[int, int]:
+        """
+        The first row scrolled to, and how many rows fit in view.
+        """
+        return self.scroll_bar.value(), self.rows_in_view
+
+    def set_count(self, count: int):
+        self.count = count
+        self.update_scroll_range()
 
-    if handler:
-        def wrapped_handler():
-            if format == MarkupFormat.TEXT:
-                handler(w.toPlainText())
-            elif format == MarkupFormat.HTML:
-                handler(w.toHtml())
-            elif format == MarkupFormat.MARKDOWN:
-                handler(w.toMarkdown())
+    def update_scroll_range(self):
+        self.scroll_bar.setRange(0, max(0, self.count - self.rows_in_view))
+        self.scroll_bar.setPageStep(self.rows_in_view)
 
-        w.textChanged.connect(wrapped_handler)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scroll_range()
+        self.window_changed.emit()
 
+    def wheelEvent(self, event):
+        # a notch of the wheel is 120 units, scroll three rows per notch
+        self.scroll_bar.setValue(self.scroll_bar.value() - event.angleDelta().y() // 40)
+
+
+@set_widget_style_and_signals()
+def build_virtual_list(props, children):
+    w = VirtualListWidget(props.get('row_height', 24), props.get('overscan', 5))
+    w.set_count(props.get('count', 0))
     return w
 
 
@@ -201,22 +594,27 @@ component_tag_map: Dict[TagType, Callable[[], QWidget]] = {
     TagType.DIAL: set_widget_style_and_signals(valueChanged='on_change')(QDial),
     TagType.SLIDER: set_widget_style_and_signals(valueChanged='on_change')(QSlider),
     TagType.TEXT_EDIT: build_text_edit,
+    TagType.VIRTUAL_LIST: build_virtual_list,
+    TagType.LIST_VIEW: build_list_view,
 }
 
 
 @update_widget_style_and_signals()
-def update_label(w: QLabel, previous: VirtualNode, latest: VirtualNode):
-    w.setText(latest.props.get('text', ''))
+def update_label(w: QLabel, previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if 'text' in changed:
+        w.setText(latest.props.get('text', ''))
 
 
 @update_widget_style_and_signals()
-def update_group(w: QGroupBox, previous: VirtualNode, latest: VirtualNode):
-    w.setTitle(latest.props.get('title', ''))
+def update_group(w: QGroupBox, previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if 'title' in changed:
+        w.setTitle(latest.props.get('title', ''))
 
 
 @update_widget_style_and_signals(pressed='on_click')
-def update_button(w: QPushButton, previous: VirtualNode, latest: VirtualNode):
-    w.setText(latest.props.get('text', ''))
+def update_button(w: QPushButton, previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if 'text' in changed:
+        w.setText(latest.props.get('text', ''))
 
 
 def update_tabs(w: QTabWidget, previous: VirtualNode, latest: VirtualNode):
@@ -230,50 +628,129 @@ def update_tabs(w: QTabWidget, previous: VirtualNode, latest: VirtualNode):
 
     if p_selected != l_selected:
         if l_selected is not None:
-            w.setCurrentIndex(l_selected)
+            # the wrapper shows the selected tab once the update is committed
+            w.blockSignals(True)
+            try:
+                w.setCurrentIndex(l_selected)
+            finally:
+                w.blockSignals(False)
 
 
-@update_widget_style_and_signals()
-def update_text_edit(w: QTextEdit, previous: VirtualNode, latest: VirtualNode):
-    """
-    We don't use textChanged='on_change' in the signal updater here because in Qt
-    QTextEdit.textChanged is just a notifier, it does not get the text.
+@update_widget_style_and_signals(text_edited='on_change')
+def update_text_edit(w: TextEdit, previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if 'format' in changed:
+        w.text_format = latest.props.get('format', MarkupFormat.TEXT)
 
-    If this is not performant enough we will have to deal with implementing refs.
-    """
-    p_handler, l_handler = previous.props.get('on_change'), latest.props.get('on_change')
-    p_format, l_format = previous.props.get('format', MarkupFormat.TEXT), \
-                         latest.props.get('format', MarkupFormat.TEXT)
-    if p_handler != l_handler or p_format != l_format:
-        w.textChanged.disconnect()  # disconnect all because we manage the handler here
 
-        if l_handler is not None:
-            def wrapped_handler():
-                if l_format == MarkupFormat.TEXT:
-                    l_handler(w.plainText)
-                elif l_format == MarkupFormat.HTML:
-                    l_handler(w.html)
-                elif l_format == MarkupFormat.MARKDOWN:
-                    l_handler(w.markdown)
+def update_list_items(w: Union[QComboBox, QListView], previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if changed & {'keys', 'values'}:
+        w.model().set_items(list_items(latest.props))
+
 
-            w.textChanged.connect(wrapped_handler)
+@update_widget_style_and_signals()
+def update_virtual_list(w: VirtualListWidget, previous: VirtualNode, latest: VirtualNode, changed: Set[str]):
+    if changed & {'row_height', 'overscan'}:
+        w.row_height = latest.props.get('row_height', 24)
+        w.overscan = latest.props.get('overscan', 5)
+
+    if changed & {'count', 'row_height'}:
+        # clamping the scroll bar would report the window as moved, but the rows are
+        # re-rendered by the update which is applying these props anyway
+        w.blockSignals(True)
+        try:
+            w.set_count(latest.props.get('count', 0))
+        finally:
+            w.blockSignals(False)
 
 
 tag_update_map: Dict[TagType, Callable[[QWidget, VirtualNode], None]] = {
     TagType.LABEL: update_label,
     TagType.GROUP: update_group,
     TagType.BUTTON: update_button,
-    TagType.TABS: update_tabs,  # TODO, handle changes in number and order of tabs
+    TagType.TABS: update_tabs,
     TagType.CHECK_BOX: update_widget_style_and_signals(stateChanged='on_change')(),
-    TagType.COMBO_BOX: update_widget_style_and_signals(activated=(str, 'on_change'))(),
+    TagType.COMBO_BOX: update_widget_style_and_signals(activated=(str, 'on_change'))(update_list_items),
     TagType.SPIN_BOX: update_widget_style_and_signals(valueChanged='on_change')(),
     TagType.LINE_EDIT: update_widget_style_and_signals(textChanged='on_change')(),
     TagType.SLIDER: update_widget_style_and_signals(valueChanged='on_change')(),
     TagType.DIAL: update_widget_style_and_signals(valueChanged='on_change')(),
     TagType.TEXT_EDIT: update_text_edit,
+    TagType.VIRTUAL_LIST: update_virtual_list,
+    TagType.LIST_VIEW: update_widget_style_and_signals(item_selected='on_change')(update_list_items),
 }
 
 
+class WidgetPool:
+    """
+    Keeps widgets which have been unmounted around so that they can be reused instead of
+    constructing new ones, which is the most expensive thing we do. This helps a lot when
+    toggling between views, for instance with conditionally rendered panels.
+
+    Only widgets whose updater can bring them fully in line with new markup are pooled. On
+    release, a widget's signal connections are removed and we remember the props it still
+    displays. On reuse it is updated from those props to the markup being mounted, so props
+    and styles are reset only where they differ, which saves re-parsing identical stylesheets.
+
+    At most ``max_size`` widgets of each tag are kept, evicting the least recently released.
+    Set ``max_size = 0`` to disable pooling.
+    """
+    recyclable_tags = {TagType.LABEL, TagType.GROUP, TagType.BUTTON, }
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.free: Dict[TagType, Deque[Tuple[QWidget, VirtualNode]]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, element: VirtualNode) -> Optional[QWidget]:
+        """
+        A pooled widget with the props of ``element`` applied, or None if there isn't one.
+        """
+        free = self.free.get(element.tag_type)
+        if not free:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        w, displayed = free.pop()
+        tag_update_map[element.tag_type](w, displayed, element)
+        return w
+
+    def release(self, element: VirtualNode, w: QWidget):
+        """
+        Disconnect and keep ``w``, which was last rendered from ``element``, for reuse. The
+        caller should already have detached ``w`` from its parent.
+        """
+        if element.tag_type not in self.recyclable_tags or self.max_size <= 0:
+            return
+
+        displayed = VirtualNode(element.tag_type, props={
+            k: v for k, v in element.props.items() if not callable(v)
+        })
+        tag_update_map[element.tag_type](w, element, displayed)  # drops the signal handlers
+
+        free = self.free.setdefault(element.tag_type, deque())
+        free.append((w, displayed))
+
+        while len(free) > self.max_size:
+            free.popleft()  # we own detached widgets, so dropping them deletes them
+
+    def clear(self):
+        self.free = {}
+
+
+widget_pool = WidgetPool()
+
+
+@dataclass
+class TabPage:
+    key: Hashable
+    element: VirtualNode  # the latest markup for the tab, whether or not it is mounted
+    page: Optional[QWidget] = None  # created when the update adding the tab is committed
+    wrapper: Optional[WrapperT] = None  # None until shown, for lazy tabs
+
+
 @dataclass
 class QtDOMWrapper(HostWrapper):
     element: VirtualNode
@@ -281,70 +758,195 @@ class QtDOMWrapper(HostWrapper):
     host_node: QWidget = None
     host_container: QWidget = None
     wrapped_children: List[WrapperT] = field(default_factory=list)
+    parent: Optional[WrapperT] = field(default=None, repr=False, compare=False)
+    depth: int = 0
+    is_discarded: bool = False
+    is_dirty: bool = False
+
+    # for virtual lists, the rows in view as the children of a stand-in element, and the
+    # viewport they were rendered for, taken on the GUI thread
+    rows: Optional[VirtualNode] = field(default=None, repr=False)
+    viewport: Tuple[int, int] = field(default=(0, 1), repr=False)
 
-    def receive(self, element: VirtualNode) -> QWidget:
+    # for tabs, one page per child, and the tabs from the most recently viewed on
+    tabs: List[TabPage] = field(default_factory=list, repr=False)
+    viewed_tabs: List[TabPage] = field(default_factory=list, repr=False)
+
+    def receive(self, element: VirtualNode) -> List[WorkT]:
         return self.update(self.element, element)
 
-    def update(self, previous: VirtualNode, latest: VirtualNode) -> QWidget:
-        self.update_properties(previous, latest)
+    def update(self, previous: VirtualNode, latest: VirtualNode) -> List[WorkT]:
+        if previous is not latest and previous.props != latest.props and self.element.tag_type != TagType.TABS:
+            reconciler.effect(self.update_properties, previous, latest)
 
-        if self.element.tag_type not in {TagType.BUTTON, TagType.LABEL, }:
-            self.update_children(previous, latest)
+        work = []
+        if self.element.tag_type == TagType.VIRTUAL_LIST:
+            work = self.update_rows(latest)
+        elif self.element.tag_type == TagType.TABS:
+            work = self.update_tabs(latest)
+        elif self.element.tag_type not in {TagType.BUTTON, TagType.LABEL, }:
+            work = self.update_children(previous, latest)
 
         self.element = latest
 
-        return self.host_node
+        return work
+
+    def render_rows(self, element: VirtualNode) -> VirtualNode:
+        render_row = element.props['render_row']
+        count = element.props.get('count', 0)
+        first, rows_in_view = self.viewport
+
+        # clamp ourselves, the scroll bar may not have been told about ``count`` yet
+        first = min(first, max(0, count - rows_in_view))
+        window = range(first, min(count, first + rows_in_view + element.props.get('overscan', 5)))
+        return VirtualNode(element.tag_type, children=[render_row(i) for i in window])
+
+    def update_rows(self, element: VirtualNode) -> List[WorkT]:
+        """
+        Re-render the rows of a virtual list which are in view. Rows are matched by position
+        (unless they have keys), so scrolling reuses the same wrappers and widgets for the
+        rows which come into view.
+        """
+        rows = self.render_rows(element)
+        work = self.update_children(self.rows, rows)
+        self.rows = rows
+        return work
+
+    def scroll_rows(self):
+        # scrolling goes through the scheduler like a state update, so that a burst of scroll
+        # events renders once and never lands in the middle of a reconcile
+        self.viewport = self.host_node.viewport()
+        reconciler.schedule_update(self)
+
+    def update_tabs(self, latest: VirtualNode) -> List[WorkT]:
+        """
+        Match tabs by the key of their child, or their position, so that tabs can be added,
+        removed, and reordered without remounting the others. Pages are only rearranged,
+        and new tabs mounted, on commit.
+        """
+        previous_by_key = {tab.key: tab for tab in self.tabs}
+        tabs, work = [], []
+        for i, child in enumerate(normalize_children(latest.children)):
+            key = child_key(child, i)
+            tab = previous_by_key.pop(key, None)
+            if tab is None:
+                tab = TabPage(key, child)
+            elif tab.wrapper is not None and tab.wrapper.element.tag_type != child.tag_type:
+                reconciler.discard(tab.wrapper)
+                tab.wrapper = None  # mounted again on commit
+            elif tab.wrapper is not None:
+                work.append((tab.wrapper, child))
+
+            tab.element = child
+            tabs.append(tab)
+
+        for stale_tab in previous_by_key.values():
+            if stale_tab.wrapper is not None:
+                reconciler.discard(stale_tab.wrapper)
+
+        reconciler.effect(self.arrange_tabs, tabs, latest.props.get('labels', []))
+        if self.element is not latest and self.element.props != latest.props:
+            reconciler.effect(self.update_properties, self.element, latest)
+
+        reconciler.effect(self.show_tabs, tabs, latest.props)
+
+        self.tabs = tabs
+        return work
+
+    def arrange_tabs(self, tabs: List[TabPage], labels: List[str]):
+        w: QTabWidget = self.host_node
+        w.blockSignals(True)  # the selected tab is shown by ``show_tabs``
+        try:
+            pages = {id(tab.page) for tab in tabs}
+            for i in reversed(range(w.count())):
+                page = w.widget(i)
+                if id(page) not in pages:
+                    w.removeTab(i)
+                    page.setParent(None)
+
+            for i, tab in enumerate(tabs):
+                label = labels[i] if i < len(labels) else ''
+                if tab.page is None:
+                    tab.page = build_tab_page()
+                    w.insertTab(i, tab.page, label)
+                    continue
+
+                index = w.indexOf(tab.page)
+                if index != i:
+                    w.tabBar().moveTab(index, i)
+
+                if w.tabText(i) != label:
+                    w.setTabText(i, label)
+        finally:
+            w.blockSignals(False)
+
+    def show_tabs(self, tabs: List[TabPage], props: Dict[str, Any]):
+        """
+        Mount the tabs which should be shown: with the ``lazy`` prop only the current tab,
+        otherwise all of them. With ``unmount_hidden``, the tabs which were not among the
+        ``keep_alive`` most recently viewed are unmounted again.
+        """
+        current = self.host_node.currentIndex()
+
+        for i, tab in enumerate(tabs):
+            if tab.wrapper is None and (i == current or not props.get('lazy', False)):
+                tab.wrapper = reconciler.wrap(tab.element, self)
+                reconciler.mount(tab.wrapper, tab.page)
+
+        if not 0 <= current < len(tabs):
+            return
+
+        viewed = [tabs[current]] + [tab for tab in self.viewed_tabs if tab is not tabs[current] and tab in tabs]
+        if props.get('unmount_hidden', False):
+            for tab in viewed[max(1, props.get('keep_alive', 1)):]:
+                if tab.wrapper is not None:
+                    tab.wrapper.is_discarded = True
+                    reconciler.unmount(tab.wrapper)
+                    tab.wrapper = None
+
+        self.viewed_tabs = viewed
+
+    def select_tab(self, _index: int):
+        # like scrolling, this goes through the scheduler, but shows the tab straight away
+        with reconciler.batched_updates():
+            reconciler.schedule_update(self)
+
+    def update_if_necessary(self) -> List[WorkT]:
+        self.is_dirty = False
+        if self.element.tag_type == TagType.TABS:
+            reconciler.effect(self.show_tabs, self.tabs, self.element.props)
+            return []
+
+        return self.update_rows(self.element)
 
     def update_properties(self, previous: VirtualNode, latest: VirtualNode):
         tag_update_map[self.element.tag_type](self.host_node, previous, latest)
 
-    def update_children(self, previous: VirtualNode, latest: VirtualNode):
-        """
-        Update the children for an actual node. This is naive because it does not
-        handle moving children that do not need to be unmounted. This will need
-        to be revisited once it becomes a problem.
+    def child_container(self, index: int) -> QWidget:
+        if self.element.tag_type == TagType.VIRTUAL_LIST:
+            return self.host_node.body
 
-        This also doesn't handle Tabs appropriately at the moment.
-        """
-        p_children = previous.children
-        p_children: List[VirtualNode] = [p_children] if isinstance(p_children, VirtualNode) \
-            else p_children
-        l_children = latest.children
-        l_children: List[VirtualNode] = [l_children] if isinstance(l_children, VirtualNode) \
-            else l_children
+        return self.host_node
 
-        new_wrapped_children = []
+    def index_in_container(self) -> int:
+        return self.host_container.layout().indexOf(self.host_node)
 
-        for i, child_elem in enumerate(l_children):
-            try:
-                previous_wrapped_child = self.wrapped_children[i]
-            except IndexError:
-                new_wrapped_child = reconciler.wrap(child_elem)
-                reconciler.mount(new_wrapped_child, self.host_node)
-                new_wrapped_children.append(new_wrapped_child)
-                continue
-
-            p_child, l_child = p_children[i], l_children[i]
-            if p_child.tag_type != l_child.tag_type:
-                # completely unmount the tree
-                previous_wrapped_child.unmount()
-                next_child = reconciler.wrap(l_child)
-                reconciler.mount(next_child, self.host_node)
-            else:
-                reconciler.receive(previous_wrapped_child, l_child)
-                new_wrapped_children.append(previous_wrapped_child)
-
-        for stale_child in self.wrapped_children[len(l_children):]:
-            reconciler.unmount(stale_child)
-
-        self.wrapped_children = new_wrapped_children
+    def move_before(self, sibling: Optional[WrapperT]):
+        layout = self.host_container.layout()
+        layout.removeWidget(self.host_node)
+
+        index = -1 if sibling is None else sibling.index_in_container()
+        layout.insertWidget(index, self.host_node)
 
     def set_text_content(self, text: str):
         label: QLabel = self.host_node
         label.setText(text)
 
     def inflate(self) -> QWidget:
-        dom_element = component_tag_map[self.element.tag_type](self.element.props, self.element.children)
+        dom_element = widget_pool.acquire(self.element)
+        if dom_element is None:
+            dom_element = component_tag_map[self.element.tag_type](self.element.props, self.element.children)
+
         return dom_element
 
     def unmount(self, container: QWidget = None):
@@ -352,43 +954,118 @@ class QtDOMWrapper(HostWrapper):
             container = self.host_container
 
         for i, wrapper in enumerate(self.wrapped_children):
-            if self.element.tag_type == TagType.TABS:
-                reconciler.unmount(wrapper, self.host_node.widget(i))
-            else:
-                reconciler.unmount(wrapper, self.host_node)
+            reconciler.unmount(wrapper, self.child_container(i))
+
+        for tab in self.tabs:
+            if tab.wrapper is not None:
+                reconciler.unmount(tab.wrapper, tab.page)
 
+        cancel_rate_limits(self.host_node)
         container.layout().removeWidget(self.host_node)
+        self.host_node.setParent(None)
+        widget_pool.release(self.element, self.host_node)
 
-    def mount(self, container: QWidget):
-        self.host_container = container
+    def reorder_children(self, wrappers: List[WrapperT]):
+        # the layout only holds our children, so we can empty it from the back
+        # and refill it rather than searching it once per moved widget
+        layout = self.child_container(0).layout()
+        for i in reversed(range(layout.count())):
+            layout.takeAt(i)
+
+        for wrapper in wrappers:
+            layout.addWidget(wrapper.host_node)
 
-        dom_element = self.inflate()
-        container.layout().addWidget(dom_element)
-        self.host_node = dom_element
+    def mount(self, container: QWidget, index: int = None):
+        self.host_container = container
+        self.host_node = dom_element = self.inflate()
 
+        # build the subtree before attaching it, so that a visible container changes only once
         children = self.element.children
-        if not isinstance(children, str):
-            children = (children,) if isinstance(children, VirtualNode) else children
-            for i, child in enumerate(children):
-                wrapper = reconciler.wrap(child)
-                self.wrapped_children.append(wrapper)
+        if self.element.tag_type == TagType.VIRTUAL_LIST:
+            self.viewport = dom_element.viewport()
+            self.rows = self.render_rows(self.element)
+            children = self.rows.children
+
+        if self.element.tag_type == TagType.TABS:
+            self.tabs = [
+                TabPage(child_key(child, i), child, dom_element.widget(i))
+                for i, child in enumerate(normalize_children(children))
+            ]
+            self.show_tabs(self.tabs, self.element.props)
+            dom_element.currentChanged.connect(self.select_tab)
+            children = None
+
+        for i, child in enumerate(normalize_children(children)):
+            wrapper = reconciler.wrap(child, self)
+            self.wrapped_children.append(wrapper)
+            reconciler.mount(wrapper, self.child_container(i))
+
+        if index is None:
+            container.layout().addWidget(dom_element)
+        else:
+            container.layout().insertWidget(index, dom_element)
 
-                if self.element.tag_type == TagType.TABS:
-                    reconciler.mount(wrapper, dom_element.widget(i))
-                else:
-                    reconciler.mount(wrapper, dom_element)
+        if self.element.tag_type == TagType.VIRTUAL_LIST:
+            dom_element.window_changed.connect(self.scroll_rows)
 
         return dom_element
 
     @classmethod
     def use_as_renderer(cls):
-        from extra_qt import reconciler
         reconciler.host_wrapper_cls = cls
         reconciler.host_node_cls = QWidget
 
+    @staticmethod
+    @contextmanager
+    def suspend_updates():
+        """
+        Stop the visible windows from repainting until the commit is done, then repaint each
+        once. Layouts need no help, they are activated from the event loop in any case.
+        """
+        windows = [w for w in QApplication.topLevelWidgets() if w.isVisible() and w.updatesEnabled()]
+        for w in windows:
+            w.setUpdatesEnabled(False)
+
+        try:
+            yield
+        finally:
+            for w in windows:
+                w.setUpdatesEnabled(True)
+
+
+def schedule_on_event_loop(callback: Callable[[], None]):
+    """
+    Run ``callback`` once control returns to the Qt event loop. Used by the reconciler
+    to flush all state updates made during one pass of the event loop together.
+    """
+    QTimer.singleShot(0, callback)
+
+
+class GuiThreadInvoker(QObject):
+    # emitted from any thread, received on the thread the invoker was created on
+    invoke = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.invoke.connect(self.call, Qt.QueuedConnection)
+
+    @staticmethod
+    def call(callback: Callable[[], None]):
+        callback()
+
+
+_gui_thread_invoker = GuiThreadInvoker()  # modules are imported on the GUI thread
+
+
+def call_on_gui_thread(callback: Callable[[], None]):
+    """
+    Run ``callback`` on the GUI thread, from any thread. Used by the reconciler to commit
+    updates which were reconciled on a worker thread.
+    """
+    _gui_thread_invoker.invoke.emit(callback)
+
 
 def render_window(element: VirtualNode, window=None, after_show: Optional[Callable[[QMainWindow], None]] = None):
-    from extra_qt.reconciler import reconciler
     reconciler.configure()  # <- use Qt
 
     old_window = window
@@ -1,19 +1,81 @@
+import dataclasses
+import itertools
+from bisect import bisect_left
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import Union, List, Any, Type
+from typing import Union, List, Any, Type, Optional, Sequence, Set, Dict, ContextManager
 
-from PyQt5.QtWidgets import QWidget
+from extra_qt.component import Component, shallow_equal, apply_changes, is_immutable
+from extra_qt.hooks import render_with_hooks, unmount_hooks
+from extra_qt.virtual_dom import VirtualNode, normalize_children, child_key
+from extra_qt.mutations import Mutation
+from extra_qt.reconciler import reconciler, WorkT
 
-from extra_qt.component import Component
-from extra_qt.virtual_dom import VirtualNode
-from extra_qt.reconciler import reconciler
+__all__ = ('ComponentWrapper', 'FunctionWrapper', 'HostWrapper', 'WrapperT')
 
-__all__ = ('ComponentWrapper', 'HostWrapper', 'WrapperT')
-
-WrapperT = Union['ComponentWrapper', 'HostWrapper']
+WrapperT = Union['ComponentWrapper', 'FunctionWrapper', 'HostWrapper']
 HostNodeT = Any
 
 Updateable = (dict,)
 
+_missing = object()
+
+
+def changed_props(previous: Dict[str, Any], latest: Dict[str, Any]) -> Set[str]:
+    """
+    The names of props which were added, removed, or changed between two renders.
+    """
+    if previous is latest:
+        return set()
+
+    return {
+        k for k in previous.keys() | latest.keys()
+        if previous.get(k, _missing) != latest.get(k, _missing)
+    }
+
+
+def is_same_markup(previous: VirtualNode, latest: VirtualNode) -> bool:
+    """
+    Whether a component is passed the same props and children again. Only the top level
+    is compared, children by identity, as comparing whole trees would cost as much as
+    reconciling them.
+    """
+    return previous is latest or (
+        shallow_equal(previous.props, latest.props) and
+        shallow_equal(previous.children, latest.children)
+    )
+
+
+def longest_increasing_subsequence(seq: Sequence[int]) -> Set[int]:
+    """
+    Positions in ``seq`` which make up one of its longest increasing subsequences.
+    Used to find the largest set of retained children which are already in order,
+    so that only the remaining children have to be moved.
+    """
+    tails = []  # tails[k] is the position ending the best subsequence of length k + 1
+    tail_values = []
+    predecessors = [-1] * len(seq)
+
+    for i, value in enumerate(seq):
+        k = bisect_left(tail_values, value)
+        if k > 0:
+            predecessors[i] = tails[k - 1]
+
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+
+    result = set()
+    i = tails[-1] if tails else -1
+    while i != -1:
+        result.add(i)
+        i = predecessors[i]
+
+    return result
+
 
 @dataclass
 class ComponentWrapper:
@@ -24,80 +86,168 @@ class ComponentWrapper:
     # We hold exactly one child, a wrapper for the contents of ``self.component.render()``
     # this may be a further component, or a host DOM tree.
     wrapped_child: WrapperT = None
+    pending_child: Optional[WrapperT] = field(default=None, repr=False, compare=False)  # replaces it on commit
 
     pending_state: List[Any] = field(default_factory=list)
 
+    # position in the tree, used to render dirty components parents first
+    parent: Optional[WrapperT] = field(default=None, repr=False, compare=False)
+    depth: int = 0
+
     is_rendering: bool = False
+    is_dirty: bool = False
+    is_discarded: bool = False
+    state_mutated: bool = False
 
-    def receive(self, element: VirtualNode):
+    def receive(self, element: VirtualNode) -> List[WorkT]:
         return self.update(self.element, element)
 
     @property
     def next_state(self):
         latest_state = self.component.state
 
-        for state_update in self.pending_state:
-            if isinstance(latest_state, Updateable) and isinstance(state_update, Updateable):
-                latest_state.update(state_update)
+        # swap rather than clear afterwards, as updates may be added from another thread
+        pending_state, self.pending_state = self.pending_state, []
+        for state_update in pending_state:
+            if isinstance(state_update, Updateable) and (
+                    isinstance(latest_state, Updateable) or dataclasses.is_dataclass(latest_state)):
+                # a copy if anything changed, so that the previous state can still be compared
+                # against, and otherwise the same state, so that no change is cheap to detect
+                latest_state = apply_changes(latest_state, state_update)
             elif callable(state_update):
-                latest_state = state_update(latest_state)
+                updated_state = state_update(latest_state)
+
+                # if an update gives back the mutable state it was passed, the state was
+                # mutated in place, so there is nothing to compare against and we assume it
+                # changed. Immutable state given back is simply unchanged.
+                self.state_mutated = self.state_mutated or (
+                    updated_state is latest_state and not is_immutable(latest_state))
+                latest_state = updated_state
             else:
                 latest_state = state_update
 
-        self.pending_state = []
         return latest_state
 
-    def update(self, previous: VirtualNode, latest: VirtualNode):
+    def update(self, previous: VirtualNode, latest: VirtualNode) -> List[WorkT]:
+        """
+        Render with the latest props and state. This only reconciles the component itself,
+        reconciling what it rendered is returned as work for the reconciler.
+        """
         self.is_rendering = True
-        if previous != latest:
+        self.is_dirty = False
+        if not is_same_markup(previous, latest):
             self.component.before_receive_props(latest.props, latest.children)
 
         latest_state = self.next_state
+        should_update = self.state_mutated or self.component.should_update(
+            latest.props, latest.children, latest_state)
+        self.state_mutated = False
+
         self.component.props = latest.props
         self.component.children = latest.children
         self.component.state = latest_state
+        self.element = latest
 
-        if self.component.should_update(latest.props, latest.children, latest_state):
-            self.element = latest
-            self.update_child()
-
+        work = self.update_child() if should_update else []
         self.is_rendering = False
+        return work
 
-    def update_child(self):
-        new_element = self.component.render()
+    def render(self) -> VirtualNode:
+        return self.component.render()
 
-        if new_element.tag_type == self.wrapped_child.element.tag_type:
-            reconciler.receive(self.wrapped_child, new_element)
-        else:
-            # uproot our contents and remount onto the parent container
-            reconciler.unmount(self.wrapped_child)
-            self.wrapped_child = reconciler.wrap(new_element)
-            reconciler.mount(self.wrapped_child, self.host_container)
+    def update_child(self) -> List[WorkT]:
+        new_element = reconciler.render(self)
+
+        if self.pending_child is None and new_element.tag_type == self.wrapped_child.element.tag_type:
+            return [(self.wrapped_child, new_element)]
+
+        # The new child is only swapped in when the replacement is committed. Until then
+        # siblings which are placed relative to us find our position through the mounted child.
+        is_replacing = self.pending_child is not None
+        self.pending_child = reconciler.wrap(new_element, self)
+
+        if not is_replacing:
+            self.wrapped_child.is_discarded = True
+            reconciler.effect(self.replace_child)
+
+        return []
+
+    def replace_child(self):
+        # uproot our contents and remount onto the parent container in the same place
+        previous_child, self.wrapped_child, self.pending_child = \
+            self.wrapped_child, self.pending_child, None
 
-    def mount(self, container: QWidget) -> QWidget:
+        index = previous_child.index_in_container()
+        reconciler.unmount(previous_child)
+        reconciler.mount(self.wrapped_child, self.host_container, index)
+
+    @property
+    def host_node(self):
+        return self.wrapped_child.host_node
+
+    def index_in_container(self) -> int:
+        return self.wrapped_child.index_in_container()
+
+    def move_before(self, sibling: Optional[WrapperT]):
+        self.wrapped_child.move_before(sibling)
+
+    def mount(self, container: HostNodeT, index: int = None) -> HostNodeT:
         component_cls: Type[Component] = self.element.tag_type
         self.component = component_cls(self.element.props, self.element.children)
         self.component.wrapper = self
 
         self.component.before_mount()
-        widget = self.initial_mount(container)
+        widget = self.initial_mount(container, index)
         self.component.after_mount()
 
         return widget
 
-    def unmount(self, container: QWidget = None):
+    def unmount(self, container: HostNodeT = None):
+        self.is_dirty = False  # any pending update is now moot
         self.component.before_unmount()
         reconciler.unmount(self.wrapped_child, container)
 
-    def initial_mount(self, container: reconciler.host_wrapper_cls):
+    def initial_mount(self, container: reconciler.host_wrapper_cls, index: int = None):
         self.host_container = container
-        self.wrapped_child = reconciler.wrap(self.component.render())
-        return reconciler.mount(self.wrapped_child, container)
+        self.wrapped_child = reconciler.wrap(reconciler.render(self), self)
+        return reconciler.mount(self.wrapped_child, container, index)
 
-    def update_if_necessary(self):
+    def update_if_necessary(self) -> List[WorkT]:
         # don't rerender if we are already rendering.
-        if not self.is_rendering:
-            self.update(self.element, self.element)
+        if self.is_rendering:
+            return []
+
+        return self.update(self.element, self.element)
+
+
+@dataclass
+class FunctionWrapper(ComponentWrapper):
+    """
+    Wraps a function component, ``fn(props, children) -> VirtualNode``. There is no
+    component instance: state and memoized values are kept in ``hooks`` and
+    ``pending_state`` holds ``(hook, update)`` pairs, see ``extra_qt.hooks``.
+    """
+    hooks: List[Any] = field(default_factory=list, repr=False)
+
+    def update(self, previous: VirtualNode, latest: VirtualNode) -> List[WorkT]:
+        self.is_rendering = True
+        self.is_dirty = False
+        self.element = latest
+
+        work = self.update_child()
+        self.is_rendering = False
+        return work
+
+    def render(self) -> VirtualNode:
+        return render_with_hooks(self)
+
+    def mount(self, container: HostNodeT, index: int = None) -> HostNodeT:
+        return self.initial_mount(container, index)
+
+    def unmount(self, container: HostNodeT = None):
+        self.is_dirty = False
+        unmount_hooks(self)
+        reconciler.unmount(self.wrapped_child, container)
 
 
 class HostWrapper:
@@ -108,8 +258,8 @@ class HostWrapper:
     You can subclass this to provide custom renderers. Currently we are working towards
     supporting:
 
-      1. Qt5
-      2. Dict-literal (for testing)
+      1. Qt5 (``.qt_renderer.QtDOMWrapper``)
+      2. Dict-literal (for testing, ``.dict_renderer.DictDOMWrapper``)
 
     There are a few other pieces of code that may need adjusting depending on the renderer.
     In particular, the virtual DOM we use has typed tags (Enum<int>). This is a very simple fix
@@ -124,20 +274,43 @@ class HostWrapper:
         just to telling the reconciler what it is supposed to wrap host elements
         (i.e. with ``type(el.tag_type) =inst= TagType``) inside.
         """
-        from extra_qt import reconciler
+        from PyQt5.QtWidgets import QWidget
         reconciler.host_wrapper_cls = cls
         reconciler.host_node_cls = QWidget
 
+    @staticmethod
+    def apply_mutations(mutations: List[Mutation]):
+        """
+        Apply the host mutations of a deferred commit, in order.
+        """
+        for mutation in mutations:
+            reconciler.apply_effect(mutation)
+
+    @staticmethod
+    def suspend_updates() -> ContextManager:
+        """
+        Hold back repainting the host while a large commit is applied, if the host supports it.
+        """
+        return nullcontext()
+
     element: VirtualNode  # virtual markup for this component
     host_node: HostNodeT = None  # what we rendered to
     host_container: HostNodeT = None  # where the node we rendered to is attached
     wrapped_children: List[WrapperT] = field(default_factory=list)
+    parent: Optional[WrapperT] = None
+    depth: int = 0
+    is_discarded: bool = False
+    is_dirty: bool = False  # only host elements which update themselves (i.e. on scroll) use this
 
-    def receive(self, element: VirtualNode):
+    def receive(self, element: VirtualNode) -> List[WorkT]:
         """
         Called when the wrapper receives new markup in order to trigger an update.
         What happens here depends a lot currently on the render target, i.e. that we are
         targeting Qt, as a result, this is implemented (for instance) in ``.qt_renderer``
+
+        Changes to the host node should be made through ``reconciler.effect`` so that they
+        can be deferred, and children should not be updated directly: instead the work for
+        them is returned, as from ``update_children``.
         """
         raise NotImplementedError()
 
@@ -152,10 +325,124 @@ class HostWrapper:
         """
         raise NotImplementedError()
 
-    def mount(self, container: HostNodeT):
+    def mount(self, container: HostNodeT, index: int = None):
         """
         Attach me to the render tree. This consists of generating (rendering) the output,
         be it a QWidget, a dictionary, or something else, before ultimately attaching it onto
-        the target container.
+        the target container, at position ``index`` if provided and otherwise at the end.
         """
         raise NotImplementedError()
+
+    def index_in_container(self) -> int:
+        """
+        Where ``self.host_node`` currently sits among the children of ``self.host_container``.
+        """
+        raise NotImplementedError()
+
+    def move_before(self, sibling: Optional[WrapperT]):
+        """
+        Move ``self.host_node`` inside its container so that it directly precedes
+        ``sibling``'s host node, or to the end of the container if ``sibling`` is None.
+        The node is not unmounted, so all of its state and downstream nodes are retained.
+        """
+        raise NotImplementedError()
+
+    def reorder_children(self, wrappers: List[WrapperT]):
+        """
+        Put the (already mounted) host nodes of ``wrappers`` in this order. Renderers
+        can override this if they have a cheaper way to reorder many nodes at once.
+        """
+        next_sibling = None
+        for wrapper in reversed(wrappers):
+            wrapper.move_before(next_sibling)
+            next_sibling = wrapper
+
+    def child_container(self, index: int) -> HostNodeT:
+        """
+        The host node that the child at ``index`` should be mounted into. For most
+        elements this is just ``self.host_node``.
+        """
+        return self.host_node
+
+    def update_children(self, previous: VirtualNode, latest: VirtualNode) -> List[WorkT]:
+        """
+        Keyed reconciliation of children. Children are matched across renders by their key,
+        or by position if they do not have one. Matched children of the same tag are returned
+        as work so that they receive their new markup, everything else is unmounted or mounted
+        as needed.
+
+        Retained children are reordered by moving the fewest host nodes possible: the longest
+        run of children which are already in the right relative order stays put and the others
+        are moved before their next sibling. Inserting, removing, or moving a single child in
+        a long list therefore costs a single host mutation rather than touching every child.
+        """
+        l_children = normalize_children(latest.children)
+        p_children = normalize_children(previous.children)
+
+        previous_by_key = {}
+        duplicates = []  # keys should be unique among siblings, extras are never matched
+        for i, (p_child, wrapper) in enumerate(zip(p_children, self.wrapped_children)):
+            key = child_key(p_child, i)
+            if key in previous_by_key:
+                duplicates.append(wrapper)
+            else:
+                previous_by_key[key] = wrapper
+
+        previous_index = {id(wrapper): i for i, wrapper in enumerate(self.wrapped_children)}
+
+        matched = []  # either a retained wrapper or None for children which need mounting
+        for i, l_child in enumerate(l_children):
+            wrapper = previous_by_key.pop(child_key(l_child, i), None)
+            if wrapper is not None and wrapper.element.tag_type != l_child.tag_type:
+                # completely unmount the tree
+                reconciler.discard(wrapper)
+                wrapper = None
+
+            matched.append(wrapper)
+
+        for stale_child in itertools.chain(previous_by_key.values(), duplicates):
+            reconciler.discard(stale_child)
+
+        retained = [i for i, wrapper in enumerate(matched) if wrapper is not None]
+        in_order = longest_increasing_subsequence([previous_index[id(matched[i])] for i in retained])
+        stationary = {retained[k] for k in in_order}
+
+        if len(retained) - len(stationary) > len(l_children) // 2:
+            # most children move, it is cheaper to put everything in order in one pass
+            new_wrapped_children = []
+            for i, wrapper in enumerate(matched):
+                if wrapper is None:
+                    wrapper = reconciler.wrap(l_children[i], self)
+                    reconciler.effect(self.mount_child, wrapper, i, None)
+
+                new_wrapped_children.append(wrapper)
+
+            reconciler.effect(self.reorder_children, new_wrapped_children)
+        else:
+            next_sibling = None
+            new_wrapped_children = [None] * len(l_children)
+            for i in reversed(range(len(l_children))):
+                wrapper = matched[i]
+                if wrapper is None:
+                    wrapper = reconciler.wrap(l_children[i], self)
+                    reconciler.effect(self.mount_child, wrapper, i, next_sibling)
+                elif i not in stationary:
+                    reconciler.effect(wrapper.move_before, next_sibling)
+
+                new_wrapped_children[i] = wrapper
+                next_sibling = wrapper
+
+        self.wrapped_children = new_wrapped_children
+
+        return [(wrapper, l_child) for wrapper, l_child in zip(matched, l_children) if wrapper is not None]
+
+    def mount_child(self, wrapper: WrapperT, i: int, next_sibling: Optional[WrapperT]):
+        """
+        Mount the new child at position ``i`` directly before ``next_sibling``.
+        """
+        container = self.child_container(i)
+        index = None
+        if next_sibling is not None and next_sibling.host_container is container:
+            index = next_sibling.index_in_container()
+
+        reconciler.mount(wrapper, container, index)
@@ -0,0 +1,287 @@
+"""
+Application state kept outside of components, in nested dicts and dataclasses::
+
+    store = Store(dict(prices={'AAPL': 180.0, 'MSFT': 410.0}))
+
+    @connect(store, lambda state, props: dict(price=state['prices'][props['symbol']]))
+    class Row(Component):
+        def render(self):
+            return label(f'{self.props["symbol"]}: {self.props["price"]}')
+
+    store.set(('prices', 'AAPL'), 181.5)  # renders the AAPL row only
+
+A connected component records which paths of the store its selector reads, and is only
+rendered again when one of those paths changes and the selected props differ.
+"""
+import dataclasses
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Set, Tuple
+
+from extra_qt.component import Component, shallow_equal
+from extra_qt.dom.qt_dom import create_element
+from extra_qt.reconciler import reconciler, batched_updates
+
+__all__ = ('Store', 'connect',)
+
+PathT = Tuple[Hashable, ...]
+SelectorT = Callable[[Any, Dict[str, Any]], Dict[str, Any]]
+
+
+def _child(node: Any, key: Hashable) -> Any:
+    return node[key] if isinstance(node, Mapping) else getattr(node, key)
+
+
+def _with_child(node: Any, key: Hashable, value: Any) -> Any:
+    # copy on write, so that a selection from the previous state is left as it was
+    if isinstance(node, Mapping):
+        return {**node, key: value}
+
+    return dataclasses.replace(node, **{key: value})
+
+
+def _is_container(value: Any) -> bool:
+    return isinstance(value, Mapping) or dataclasses.is_dataclass(value) and not isinstance(value, type)
+
+
+class _Reader:
+    """
+    A read-only view of part of the store, which records the paths read through it.
+    Iterating a node, or taking its length, reads the whole node.
+    """
+    __slots__ = ('_node', '_path', '_read',)
+
+    def __init__(self, node: Any, path: PathT, read: Set[PathT]):
+        self._node = node
+        self._path = path
+        self._read = read
+
+    def _descend(self, key: Hashable):
+        path = self._path + (key,)
+        value = _child(self._node, key)
+        if _is_container(value):
+            return _Reader(value, path, self._read)
+
+        self._read.add(path)
+        return value
+
+    def __getitem__(self, key: Hashable):
+        return self._descend(key)
+
+    def __getattr__(self, key: str):
+        return self._descend(key)
+
+    def get(self, key: Hashable, default: Any = None):
+        try:
+            return self._descend(key)
+        except (KeyError, AttributeError):
+            self._read.add(self._path + (key,))
+            return default
+
+    def __contains__(self, key: Hashable):
+        self._read.add(self._path + (key,))
+        return key in self._node
+
+    def __iter__(self):
+        return iter(self.unwrap())
+
+    def __len__(self):
+        return len(self.unwrap())
+
+    def keys(self):
+        return self.unwrap().keys()
+
+    def values(self):
+        return self.unwrap().values()
+
+    def items(self):
+        return self.unwrap().items()
+
+    def unwrap(self) -> Any:
+        """
+        The node itself, which reads all of it.
+        """
+        self._read.add(self._path)
+        return self._node
+
+
+def _unwrap(value: Any) -> Any:
+    # a selection which holds part of the store reads all of it
+    if isinstance(value, _Reader):
+        return value.unwrap()
+
+    if type(value) in (list, tuple):
+        return type(value)(_unwrap(item) for item in value)
+
+    if type(value) is dict:
+        return {k: _unwrap(v) for k, v in value.items()}
+
+    return value
+
+
+class _PathNode:
+    __slots__ = ('children', 'subscriptions',)
+
+    def __init__(self):
+        self.children: Dict[Hashable, '_PathNode'] = {}
+        self.subscriptions: Set['Connected'] = set()
+
+
+class Store:
+    """
+    Holds nested dicts and dataclasses in ``state``, which is never changed in place:
+    ``set`` replaces the nodes along the changed path, so unchanged parts are shared with
+    the previous state and can be compared with ``is``.
+
+    Changes are collected and connected components are notified once per pass of the event
+    loop. Stores should be changed on the GUI thread, see ``call_on_gui_thread`` otherwise.
+    """
+    def __init__(self, state: Any):
+        self.state = state
+        self.changed: List[PathT] = []
+        self.notify_scheduled = False
+        self.subscriptions = _PathNode()
+
+    def get(self, path: PathT) -> Any:
+        node = self.state
+        for key in path:
+            node = _child(node, key)
+
+        return node
+
+    def set(self, path: PathT, value: Any):
+        self.update({path: value})
+
+    def update(self, changes: Dict[PathT, Any]):
+        """
+        Set the value at each path. The last key of a path may be new to a dict, the nodes
+        above it have to exist.
+        """
+        for path, value in changes.items():
+            nodes = [self.state]
+            for key in path[:-1]:
+                nodes.append(_child(nodes[-1], key))
+
+            try:
+                if _child(nodes[-1], path[-1]) is value:
+                    continue
+            except (KeyError, AttributeError):
+                pass
+
+            for node, key in zip(reversed(nodes), reversed(path)):
+                value = _with_child(node, key, value)
+
+            self.state = value
+            self.changed.append(path)
+
+        if self.changed and not self.notify_scheduled:
+            self.notify_scheduled = True
+            if reconciler.schedule_flush is None:
+                self.notify()
+            else:
+                reconciler.schedule_flush(self.notify)
+
+    def select(self, selector: SelectorT, props: Dict[str, Any]) -> Tuple[Dict[str, Any], Set[PathT]]:
+        """
+        ``selector(state, props)`` and the paths of the state it read. Parts of the state
+        which are selected as they are, like a whole row, are given as the nodes themselves.
+        """
+        read: Set[PathT] = set()
+        selected = selector(_Reader(self.state, (), read), props)
+        return {k: _unwrap(v) for k, v in selected.items()}, read
+
+    def track(self, subscription: 'Connected', paths: Set[PathT]):
+        self.untrack(subscription)
+        subscription.paths = paths
+        for path in paths:
+            node = self.subscriptions
+            for key in path:
+                node = node.children.setdefault(key, _PathNode())
+
+            node.subscriptions.add(subscription)
+
+    def untrack(self, subscription: 'Connected'):
+        for path in subscription.paths:
+            node = self.subscriptions
+            for key in path:
+                node = node.children.get(key)
+                if node is None:
+                    break
+            else:
+                node.subscriptions.discard(subscription)
+
+        subscription.paths = set()
+
+    def affected(self, path: PathT) -> Set['Connected']:
+        """
+        Subscriptions which read ``path``, a node above it, or anything beneath it.
+        """
+        affected = set()
+        node = self.subscriptions
+        for key in path:
+            affected |= node.subscriptions
+            node = node.children.get(key)
+            if node is None:
+                return affected
+
+        beneath = [node]
+        while beneath:
+            node = beneath.pop()
+            affected |= node.subscriptions
+            beneath.extend(node.children.values())
+
+        return affected
+
+    def notify(self):
+        self.notify_scheduled = False
+        changed, self.changed = self.changed, []
+
+        affected = set()
+        for path in changed:
+            affected |= self.affected(path)
+
+        with batched_updates():
+            for subscription in affected:
+                selected, _ = self.select(subscription.selector, subscription.props)
+                if not shallow_equal(selected, subscription.selected):
+                    reconciler.schedule_update(subscription.wrapper)
+
+
+class Connected(Component):
+    """
+    Renders ``component_cls`` with its props merged with those selected from ``store``.
+    Made with ``connect``.
+    """
+    store: Store = None
+    selector: SelectorT = None
+    component_cls: Any = None
+
+    def __init__(self, props, children):
+        super().__init__(props, children)
+        self.selected: Optional[Dict[str, Any]] = None
+        self.paths: Set[PathT] = set()
+
+    def render(self):
+        self.selected, paths = self.store.select(self.selector, self.props)
+        if paths != self.paths:
+            self.store.track(self, paths)
+
+        return create_element(self.component_cls, {**self.props, **self.selected}, self.children)
+
+    def before_unmount(self):
+        self.store.untrack(self)
+
+
+def connect(store: Store, selector: SelectorT) -> Callable[[Any], type]:
+    """
+    Connect a component to ``store``. The component is passed the props given by
+    ``selector(state, props)`` in addition to its own, and is rendered again when they change.
+    """
+    def decorate(component_cls):
+        return type(f'Connected{component_cls.__name__}', (Connected,), {
+            'store': store,
+            'selector': staticmethod(selector),
+            'component_cls': component_cls,
+            '__module__': component_cls.__module__,
+            '__doc__': component_cls.__doc__,
+        })
+
+    return decorate
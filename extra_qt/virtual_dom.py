@@ -1,14 +1,34 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
-from typing import List, Any, Dict, Type
+from types import MappingProxyType
+from typing import List, Any, Dict, Type, Hashable, Optional, Mapping, Tuple
 import itertools
 
 import typing
 
 
-@dataclass
+@dataclass(frozen=True)
 class VirtualStyleSettings:
-    pass
+    """
+    Style declarations for an element, created with ``VirtualStyleSettings.of(color='red')``.
+    Styles are immutable and hashable so that all elements with the same style can share
+    one compiled stylesheet.
+    """
+    declarations: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def of(cls, **declarations: Any) -> 'VirtualStyleSettings':
+        # font_size='12px' <-> font-size: 12px;
+        return cls(tuple(sorted((k.replace('_', '-'), str(v)) for k, v in declarations.items())))
+
+    def merge(self, other: 'VirtualStyleSettings') -> 'VirtualStyleSettings':
+        """
+        These declarations, overridden by those of ``other``.
+        """
+        return VirtualStyleSettings(tuple(sorted({**dict(self.declarations), **dict(other.declarations)}.items())))
+
+    def to_stylesheet(self) -> str:
+        return ' '.join(f'{k}: {v};' for k, v in self.declarations)
 
 
 class TagType(Enum):
@@ -30,6 +50,11 @@ class TagType(Enum):
     SLIDER = 10
     TEXT_EDIT = 11
 
+    # only the rows in view are rendered
+    VIRTUAL_LIST = 14
+
+    LIST_VIEW = 15
+
     # FUTURE, unsupported
     # ========================
     # structural
@@ -47,12 +72,52 @@ class LayoutType(Enum):
 
 ChildrenT = typing.Union['VirtualNode', List['VirtualNode']]
 
+# Shared by every node without props or children, so that creating one allocates nothing
+# besides the node itself. Both are read-only, as they would otherwise leak between nodes.
+EMPTY_PROPS: Mapping[str, Any] = MappingProxyType({})
+EMPTY_CHILDREN: Tuple['VirtualNode', ...] = ()
+
 
-@dataclass
 class VirtualNode:
-    tag_type: typing.Union[TagType, Type['Component']] = TagType.LABEL
-    children: ChildrenT = field(default_factory=list)
-    props: Dict[str, Any] = field(default_factory=dict)
+    """
+    A node of markup. Render functions create very many of these, so nodes have no
+    ``__dict__`` and share the empty props and children above.
+    """
+    __slots__ = ('tag_type', 'children', 'props', 'key')
+
+    is_static = False  # see ``StaticNode``
+
+    def __init__(self, tag_type: typing.Union[TagType, Type['Component']] = TagType.LABEL,
+                 children: ChildrenT = EMPTY_CHILDREN, props: Mapping[str, Any] = EMPTY_PROPS,
+                 key: Optional[Hashable] = None):
+        self.tag_type = tag_type
+        self.children = children
+        self.props = props
+
+        # identifies this node among its siblings so that the reconciler can
+        # match children across renders even if they are reordered
+        self.key = key
+
+    def __repr__(self):
+        return (f'VirtualNode(tag_type={self.tag_type!r}, children={self.children!r}, '
+                f'props={self.props!r}, key={self.key!r})')
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        if not isinstance(other, VirtualNode):
+            return NotImplemented
+
+        # cheap checks first, and props and children are often shared between renders
+        return (
+            self.tag_type == other.tag_type and
+            self.key == other.key and
+            (self.props is other.props or self.props == other.props) and
+            (self.children is other.children or _same_children(self.children, other.children))
+        )
+
+    __hash__ = None
 
     def repr_tree(self):
         return '\n'.join(self.repr_tree_node())
@@ -67,9 +132,56 @@ class VirtualNode:
 
         if isinstance(self.children, str):
             child_lines = [[self.children]]
-        elif isinstance(self.children, list):
+        elif isinstance(self.children, (list, tuple)):
             child_lines = [safe_repr_node(child) for child in self.children]
         else:
             child_lines = [[safe_repr_node(self.children)]]
 
         return lines + ['  ' + l for l in itertools.chain(*child_lines)]
+
+
+class StaticNode(VirtualNode):
+    """
+    A node of constant markup, made with ``qt_dom.static``. Its props and children are
+    read-only and all of its children are static too. When a wrapper receives the very
+    node it already displays, the reconciler skips it and everything beneath it.
+    """
+    __slots__ = ()
+
+    is_static = True
+
+    def __repr__(self):
+        return 'Static' + super().__repr__()
+
+
+def _same_children(a: ChildrenT, b: ChildrenT) -> bool:
+    # the empty tuple and an empty list are the same markup
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(x is y or x == y for x, y in zip(a, b))
+
+    return a == b
+
+
+def normalize_children(children: ChildrenT) -> List[VirtualNode]:
+    """
+    Children can be passed as a list, a single node, or as a bare string
+    (i.e. text content). Only the first two produce child nodes.
+    """
+    if isinstance(children, VirtualNode):
+        return [children]
+
+    if isinstance(children, str) or children is None:
+        return []
+
+    return children
+
+
+def child_key(element: VirtualNode, index: int) -> Hashable:
+    """
+    The key used to match a child across renders. Unkeyed children fall back to their
+    position, as in React, so that lists without keys behave as they always have.
+    """
+    if element.key is not None:
+        return 'key', element.key
+
+    return 'index', index
@@ -0,0 +1,303 @@
+from extra_qt import render, Component
+from extra_qt.dom.qt_dom import group, label, button, create_element
+from extra_qt.renderers.dict_renderer import DictNode
+from extra_qt.virtual_dom import TagType
+
+
+class Counter(Component):
+    initial_state = 0
+
+    def increment(self):
+        self.set_state(lambda s: s + 1)
+
+    def render(self):
+        return group(dict(title='Counter'), [
+            label(f'Count: {self.state}'),
+            button(text='+', on_click=self.increment),
+        ])
+
+
+def test_mount(dict_container):
+    render(group(dict(title='Root'), [label('a')]), dict_container)
+
+    assert dict_container['children'] == [{
+        'tag': TagType.GROUP,
+        'props': {'title': 'Root'},
+        'children': [{'tag': TagType.LABEL, 'props': {'text': 'a'}, 'children': []}],
+    }]
+
+
+def test_state_updates(dict_container):
+    render(create_element(Counter), dict_container)
+    root = dict_container['children'][0]
+
+    for _ in range(3):
+        root['children'][1]['props']['on_click']()
+
+    assert root['children'][0]['props']['text'] == 'Count: 3'
+
+
+def test_keyed_reorder_and_removal(dict_container):
+    def rows(keys):
+        return group(dict(title='Rows'), [label(k, dict(key=k)) for k in keys])
+
+    render(rows('abcd'), dict_container)
+    nodes = {n['props']['text']: n for n in dict_container['children'][0]['children']}
+
+    render(rows('dbe'), dict_container)
+    children = dict_container['children'][0]['children']
+
+    assert [n['props']['text'] for n in children] == ['d', 'b', 'e']
+    assert children[0] is nodes['d'] and children[1] is nodes['b']
+
+
+def test_mutation_log(dict_container):
+    from extra_qt import reconciler
+
+    def rows(items, tick=0):
+        return group(dict(title='Rows'), [label(f'{i} {tick}', dict(key=i)) for i in items])
+
+    render(rows([1, 2, 3]), dict_container)
+    with reconciler.record_mutations() as log:
+        render(rows([0, 1, 3], tick=1), dict_container)
+
+    assert log.counts() == {'remove': 1, 'create': 1, 'insert_before': 1, 'set_prop': 2}
+    assert log.operations[0] == {'op': 'remove', 'node': 0}
+    assert {'op': 'create', 'node': 1, 'tag': 'LABEL', 'props': {'text': '0 1'}} in log.operations
+    assert '"set_prop"' in log.to_json()
+
+
+def test_replaying_a_mutation_log(dict_container):
+    import json
+    from extra_qt import reconciler
+    from extra_qt.mutations import MutationLog
+    from extra_qt.renderers.dict_renderer import DictDOMWrapper
+
+    def Cell(props, children):
+        # a component which renders different host nodes, so that it is replaced
+        if props['value'] % 2:
+            return button(text=str(props['value']))
+
+        return label(str(props['value']))
+
+    def rows(items, tick=0):
+        return group(dict(title='Rows', tick=tick) if tick else dict(title='Rows'), [
+            group(dict(title=str(i), key=i), [create_element(Cell, dict(value=i + tick)), label(f'{i} {tick}')])
+            for i in items
+        ])
+
+    render(rows([1, 2, 3]), dict_container)
+    log = MutationLog()
+    log.record_tree(dict_container.rendered)
+    with reconciler.record_mutations(log):
+        for items, tick in [([0, 1, 3], 1), ([3, 0, 1, 4], 2), ([4, 1], 0), ([1, 4, 5, 6], 3)]:
+            render(rows(items, tick), dict_container)
+
+    assert {'replace', 'remove_prop', 'remove', 'insert_before'} <= set(log.counts())
+    replayed = DictDOMWrapper.replay(json.loads(log.to_json()), DictNode.container())
+    assert replayed == dict_container
+
+
+def test_repeated_property_updates_are_coalesced(dict_container):
+    from extra_qt.mutations import Mutation, coalesce_mutations
+
+    render(label('a'), dict_container)
+    wrapper = dict_container.rendered
+    a, b, c = wrapper.element, label('b'), label('c')
+
+    mutations = coalesce_mutations([
+        Mutation('update_properties', wrapper, (a, b)),
+        Mutation('unmount', None, (wrapper,)),
+        Mutation('update_properties', wrapper, (b, c)),
+    ])
+    assert [m.op for m in mutations] == ['update_properties', 'unmount']
+
+    mutations[0].apply()
+    assert dict_container['children'][0]['props'] == {'text': 'c'}
+
+
+def test_function_components_with_hooks(dict_container):
+    from extra_qt import batched_updates, use_state, use_memo, use_callback, use_effect
+
+    computed, effects = [], []
+
+    def Total(props, children):
+        count, set_count = use_state(lambda: props['start'])
+        doubled = use_memo(lambda: computed.append(count) or count * 2, (count,))
+        increment = use_callback(lambda: set_count(lambda c: c + 1), ())
+
+        def effect():
+            effects.append(('run', props['name']))
+            return lambda: effects.append(('cleanup', props['name']))
+
+        use_effect(effect, (props['name'],))
+        return group(dict(title=props['name']), [
+            label(f'{count} {doubled}'),
+            button(text='+', on_click=increment),
+        ])
+
+    def root(name, show=True):
+        return group(dict(title='Root'), [create_element(Total, dict(name=name, start=1))] if show else [])
+
+    render(root('a'), dict_container)
+    total = dict_container['children'][0]['children'][0]
+    on_click = total['children'][1]['props']['on_click']
+    assert total['children'][0]['props']['text'] == '1 2'
+    assert effects == [('run', 'a')]
+
+    with batched_updates():
+        on_click()
+        on_click()
+
+    render(root('a'), dict_container)
+    assert total['children'][0]['props']['text'] == '3 6'
+    assert total['children'][1]['props']['on_click'] is on_click
+    assert computed == [1, 3]
+    assert effects == [('run', 'a')]
+
+    render(root('b'), dict_container)
+    render(root('b', show=False), dict_container)
+    assert effects == [('run', 'a'), ('cleanup', 'a'), ('run', 'b'), ('cleanup', 'b')]
+
+
+def test_context_updates_only_changed_consumers(dict_container):
+    from extra_qt import PureComponent, batched_updates, create_context, use_context
+
+    prices = create_context({})
+    renders = []
+
+    def Row(props, children):
+        price = use_context(prices, lambda p: p[props['symbol']])
+        renders.append(props['symbol'])
+        return label(f'{props["symbol"]} {price}')
+
+    class Table(PureComponent):
+        def render(self):
+            renders.append('table')
+            return group(dict(title='Prices'), [
+                create_element(Row, dict(symbol=s)) for s in ['A', 'B', 'C']
+            ] + [prices.consumer(lambda n: label(f'{n} symbols'), len)])
+
+    class App(Component):
+        initial_state = dict(A=1, B=2, C=3)
+
+        def render(self):
+            return prices.provider(self.state, create_element(Table))
+
+    render(create_element(App), dict_container)
+    app = dict_container['children'][0]
+    assert renders == ['table', 'A', 'B', 'C']
+
+    renders.clear()
+    with batched_updates():
+        dict_container.rendered.component.set_state(dict(B=5))
+
+    assert renders == ['B']
+    assert [row['props']['text'] for row in app['children']] == ['A 1', 'B 5', 'C 3', '3 symbols']
+
+    # without a provider consumers see the default
+    container = DictNode.container()
+    render(prices.consumer(lambda p: label(f'{p}')), container)
+    assert container['children'][0]['props']['text'] == '{}'
+
+
+def test_store_updates_only_connected_readers(dict_container):
+    from dataclasses import dataclass
+    from extra_qt import Store, connect
+
+    @dataclass(frozen=True)
+    class Settings:
+        currency: str = 'USD'
+
+    store = Store(dict(prices=dict(A=1, B=2), settings=Settings()))
+    renders = []
+
+    @connect(store, lambda state, props: dict(
+        price=state['prices'][props['symbol']], currency=state['settings'].currency,
+    ))
+    class Row(Component):
+        def render(self):
+            renders.append(self.props['symbol'])
+            return label(f'{self.props["symbol"]} {self.props["price"]} {self.props["currency"]}')
+
+    @connect(store, lambda state, props: dict(count=len(state['prices'])))
+    class Count(Component):
+        def render(self):
+            renders.append('count')
+            return label(f'{self.props["count"]} prices')
+
+    render(group(dict(title='Prices'), [
+        create_element(Row, dict(symbol='A')), create_element(Row, dict(symbol='B')), create_element(Count),
+    ]), dict_container)
+    texts = lambda: [row['props']['text'] for row in dict_container['children'][0]['children']]
+    assert texts() == ['A 1 USD', 'B 2 USD', '2 prices']
+
+    previous = store.state
+    renders.clear()
+    store.set(('prices', 'B'), 5)
+    store.set(('prices', 'C'), 3)
+    assert sorted(renders) == ['B', 'count']
+    assert previous['prices']['B'] == 2 and store.state['settings'] is previous['settings']
+
+    renders.clear()
+    store.update({('prices', 'A'): 1, ('settings', 'currency'): 'EUR'})
+    assert sorted(renders) == ['A', 'B']
+    assert texts() == ['A 1 EUR', 'B 5 EUR', '3 prices']
+
+
+def test_store_selections_of_whole_nodes(dict_container):
+    from extra_qt import Store, connect
+
+    store = Store(dict(rows=dict(A=dict(price=1), B=dict(price=2))))
+    renders = []
+
+    @connect(store, lambda state, props: dict(row=state['rows'][props['symbol']]))
+    class Row(Component):
+        def render(self):
+            renders.append(self.props['symbol'])
+            return label(f'{self.props["symbol"]} {self.props["row"]["price"]}')
+
+    render(group(dict(title='Rows'), [
+        create_element(Row, dict(symbol='A')), create_element(Row, dict(symbol='B')),
+    ]), dict_container)
+    row = dict_container['children'][0]['children'][0]
+    assert type(dict_container.rendered.wrapped_children[0].wrapped_child.component.props['row']) is dict
+
+    renders.clear()
+    store.set(('rows', 'A', 'price'), 3)
+    assert renders == ['A']
+    assert row['props']['text'] == 'A 3'
+
+
+def test_state_updates_between_incremental_slices(dict_container, monkeypatch):
+    from extra_qt import reconciler
+
+    scheduled = []
+    monkeypatch.setattr(reconciler, 'schedule_flush', scheduled.append)
+    monkeypatch.setattr(reconciler, 'frame_budget', 0.0)  # a single unit of work per slice
+
+    class Row(Component):
+        def render(self):
+            return label(f'Row {self.props["i"]}')
+
+    class List(Component):
+        initial_state = 1
+
+        def render(self):
+            return group(dict(title='Rows'), [create_element(Row, dict(i=i)) for i in range(self.state)])
+
+    render(create_element(List), dict_container)
+    rows = dict_container['children'][0]
+
+    dict_container.rendered.component.set_state(2)
+    scheduled.pop(0)()
+    assert reconciler.work_stack, 'expected the update to take more than one slice'
+
+    # the row added by the first update has not been mounted yet
+    dict_container.rendered.component.set_state(3)
+    for _ in range(100):
+        if not scheduled:
+            break
+        scheduled.pop(0)()
+
+    assert [row['props']['text'] for row in rows['children']] == ['Row 0', 'Row 1', 'Row 2']
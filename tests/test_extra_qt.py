@@ -3,3 +3,18 @@ from extra_qt import __version__
 
 def test_version():
     assert __version__ == '0.1.0'
+
+
+def test_importing_without_qt():
+    import subprocess
+    import sys
+
+    loaded = subprocess.run([sys.executable, '-c', '; '.join([
+        'import sys',
+        'import extra_qt, extra_qt.dom.qt_dom, extra_qt.renderers.dict_renderer',
+        'print(any(m.startswith("PyQt5") for m in sys.modules))',
+        'extra_qt.render_window',
+        'print(any(m.startswith("PyQt5") for m in sys.modules))',
+    ])], capture_output=True, text=True, check=True).stdout.split()
+
+    assert loaded == ['False', 'True']
@@ -0,0 +1,315 @@
+from extra_qt import render
+from extra_qt.dom.qt_dom import group, label, button
+from extra_qt.renderers.qt_renderer import widget_pool
+
+
+def panel(name, n=20):
+    return group(dict(title=name), [label(f'{name} {i}') for i in range(n)])
+
+
+def test_toggling_views_reuses_widgets(qt_container):
+    widget_pool.clear()
+
+    render(group(dict(title='Root'), [panel('A')]), qt_container)
+    render(group(dict(title='Root'), [button(text='B')]), qt_container)
+
+    misses = widget_pool.misses
+    for _ in range(5):
+        render(group(dict(title='Root'), [panel('A')]), qt_container)
+        render(group(dict(title='Root'), [button(text='B')]), qt_container)
+
+    assert widget_pool.misses == misses
+
+    render(group(dict(title='Root'), [panel('C', 10)]), qt_container)
+    reused = qt_container.rendered.wrapped_children[0]
+    assert reused.host_node.title() == 'C'
+    assert [w.host_node.text() for w in reused.wrapped_children] == [f'C {i}' for i in range(10)]
+
+
+def test_released_widgets_are_reset(qt_container):
+    widget_pool.clear()
+    clicks = []
+
+    render(group(dict(title='Root'), [
+        button(text='old', style='color: red;', on_click=lambda: clicks.append('old')),
+    ]), qt_container)
+    render(group(dict(title='Root'), []), qt_container)
+    render(group(dict(title='Root'), [button(text='new')]), qt_container)
+
+    w = qt_container.rendered.wrapped_children[0].host_node
+    assert widget_pool.hits >= 1
+    assert w.text() == 'new'
+    assert w.styleSheet() == ''
+
+    w.pressed.emit()
+    assert clicks == []
+
+
+def test_handlers_are_swapped_without_reconnecting(qt_container):
+    from extra_qt.dom.qt_dom import text_edit
+    from extra_qt.renderers.qt_renderer import MarkupFormat
+
+    clicks, texts = [], []
+
+    def tree(i):
+        return group(dict(title='Root'), [
+            button(text='b', on_click=lambda: clicks.append(i)),
+            text_edit(on_change=lambda text: texts.append((i, text)), format=MarkupFormat.TEXT),
+        ])
+
+    render(tree(0), qt_container)
+    b, edit = [w.host_node for w in qt_container.rendered.wrapped_children]
+    connections = b.receivers(b.pressed), edit.receivers(edit.textChanged)
+
+    for i in range(1, 4):
+        render(tree(i), qt_container)
+
+    assert (b.receivers(b.pressed), edit.receivers(edit.textChanged)) == connections
+
+    b.pressed.emit()
+    edit.setPlainText('hello')
+    assert clicks == [3]
+    assert texts == [(3, 'hello')]
+
+
+def test_virtual_list_only_renders_rows_in_view(qt_app, qt_container):
+    from extra_qt.dom.qt_dom import virtual_list
+
+    def rows(count):
+        return virtual_list(count, lambda i: label(f'Row {i}'), row_height=20, overscan=2)
+
+    qt_container.resize(200, 200)
+    qt_container.show()
+    render(group(dict(title='Root'), [rows(50000)]), qt_container)
+    for _ in range(3):  # lay out, then re-render the rows for the final size
+        qt_app.processEvents()
+
+    wrapper = qt_container.rendered.wrapped_children[0]
+    widget = wrapper.host_node
+    in_view = len(wrapper.wrapped_children)
+    assert 2 < in_view < 20
+    assert wrapper.wrapped_children[0].host_node.text() == 'Row 0'
+
+    first_row = wrapper.wrapped_children[0].host_node
+    widget.scroll_bar.setValue(999)
+    widget.scroll_bar.setValue(1000)
+    assert wrapper.wrapped_children[0].host_node.text() == 'Row 0', 'scrolling should be coalesced'
+    qt_app.processEvents()
+    assert wrapper.wrapped_children[0].host_node is first_row
+    assert first_row.text() == 'Row 1000'
+    assert len(wrapper.wrapped_children) == in_view
+
+    rendered = []
+
+    def new_row(i):
+        rendered.append(i)
+        return label(f'New row {i}')
+
+    render(group(dict(title='Root'), [
+        virtual_list(100, new_row, row_height=20, overscan=2),
+    ]), qt_container)
+    qt_app.processEvents()
+    texts = [w.host_node.text() for w in wrapper.wrapped_children]
+    assert texts[-1] == 'New row 99'
+    assert all(i < 100 for i in rendered)
+    qt_container.hide()
+
+
+def test_style_objects_share_one_stylesheet(qt_app, qt_container):
+    from PyQt5.QtGui import QColor
+    from extra_qt.dom.qt_dom import style
+    from extra_qt.renderers.qt_renderer import style_registry
+
+    red = style(color='#ff0000')
+    render(group(dict(title='Root'), [label(str(i), dict(style=red)) for i in range(3)]), qt_container)
+    labels = [w.host_node for w in qt_container.rendered.wrapped_children]
+
+    assert len({w.property(style_registry.STYLE_PROPERTY) for w in labels}) == 1
+    assert all(w.styleSheet() == '' for w in labels)
+
+    qt_app.processEvents()
+    assert style_registry.compile(red) in qt_app.styleSheet()
+    labels[0].ensurePolished()
+    assert labels[0].palette().color(labels[0].foregroundRole()) == QColor('#ff0000')
+
+    render(group(dict(title='Root'), [label(str(i), dict(style='color: blue;')) for i in range(3)]), qt_container)
+    assert labels[0].property(style_registry.STYLE_PROPERTY) is None
+    assert labels[0].styleSheet() == 'color: blue;'
+
+
+def test_large_commits_suspend_repaints(qt_container, monkeypatch):
+    from PyQt5.QtWidgets import QLabel
+    from extra_qt import reconciler
+
+    def tree(changed, tick):
+        return group(dict(title='Root'), [label(f'{i} {tick if i < changed else 0}') for i in range(10)])
+
+    qt_container.show()
+    render(tree(0, 0), qt_container)
+
+    painting = []
+    monkeypatch.setattr(reconciler, 'suspend_updates_after', 5)
+    monkeypatch.setattr(QLabel, 'setText', lambda w, text: painting.append(qt_container.updatesEnabled()))
+
+    render(tree(2, 1), qt_container)
+    assert painting == [True, True]
+
+    painting.clear()
+    render(tree(10, 2), qt_container)
+    assert painting == [True] * 4 + [False] * 6
+    assert qt_container.updatesEnabled()
+
+
+def tab_texts(w):
+    return [w.tabText(i) for i in range(w.count())]
+
+
+def test_lazy_tabs_mount_when_shown(qt_container):
+    from extra_qt.dom.qt_dom import tabs
+
+    def tree(**props):
+        return tabs(dict(labels=['A', 'B', 'C'], lazy=True, **props), [panel(name, 2) for name in 'ABC'])
+
+    render(tree(), qt_container)
+    wrapper = qt_container.rendered
+    w = wrapper.host_node
+    assert [tab.wrapper is not None for tab in wrapper.tabs] == [True, False, False]
+
+    w.setCurrentIndex(2)
+    assert [tab.wrapper is not None for tab in wrapper.tabs] == [True, False, True]
+    assert w.widget(2).layout().itemAt(0).widget().title() == 'C'
+
+    render(tree(unmount_hidden=True, keep_alive=2), qt_container)
+    w.setCurrentIndex(1)
+    assert [tab.wrapper is not None for tab in wrapper.tabs] == [False, True, True]
+    assert w.widget(0).layout().count() == 0
+
+
+def test_tabs_are_added_removed_and_reordered_in_place(qt_container):
+    from extra_qt.dom.qt_dom import tabs
+
+    def tree(names):
+        return tabs(dict(labels=names), [group(dict(title=name, key=name), []) for name in names])
+
+    render(tree(['A', 'B', 'C']), qt_container)
+    wrapper = qt_container.rendered
+    w = wrapper.host_node
+    before = {tab.key: tab.wrapper.host_node for tab in wrapper.tabs}
+
+    render(tree(['C', 'A', 'D']), qt_container)
+    assert tab_texts(w) == ['C', 'A', 'D']
+    assert [w.widget(i).layout().itemAt(0).widget().title() for i in range(3)] == ['C', 'A', 'D']
+    assert all(before[tab.key] is tab.wrapper.host_node for tab in wrapper.tabs if tab.key in before)
+
+
+def test_list_items_are_updated_by_row(qt_container):
+    from extra_qt.dom.qt_dom import combo_box, list_view
+
+    def tree(keys):
+        return group(dict(title='Root'), [
+            combo_box(keys=keys, values=[k.lower() for k in keys]),
+            list_view(keys=keys),
+        ])
+
+    render(tree(['A', 'B', 'C']), qt_container)
+    combo, view = [w.host_node for w in qt_container.rendered.wrapped_children]
+    signals = []
+    model = combo.model()
+    model.rowsInserted.connect(lambda _, first, last: signals.append(('inserted', first, last)))
+    model.rowsRemoved.connect(lambda _, first, last: signals.append(('removed', first, last)))
+    model.modelReset.connect(lambda: signals.append('reset'))
+
+    render(tree(['A', 'X', 'Y', 'B', 'C']), qt_container)
+    assert [combo.itemText(i) for i in range(combo.count())] == ['A', 'X', 'Y', 'B', 'C']
+    assert combo.itemData(1) == 'x'
+    assert view.model().rowCount() == 5
+
+    render(tree(['A', 'B', 'C']), qt_container)
+    render(tree(['D', 'E', 'F', 'G']), qt_container)
+    assert signals == [('inserted', 1, 2), ('removed', 1, 2), 'reset']
+    assert [combo.itemText(i) for i in range(combo.count())] == ['D', 'E', 'F', 'G']
+
+
+def test_rate_limited_handlers_get_the_latest_value(qt_app, qt_container):
+    from PyQt5.QtTest import QTest
+    from extra_qt.dom.qt_dom import slider, text_edit
+
+    calls = []
+    render(group(dict(title='Root'), [
+        slider(on_change=lambda v: calls.append(('slider', v)), on_change_throttle_ms=20, maximum=100),
+        text_edit(on_change=lambda t: calls.append(('text', t)), on_change_debounce_ms=0),
+    ]), qt_container)
+    w_slider, w_text = [w.host_node for w in qt_container.rendered.wrapped_children]
+
+    for v in range(1, 11):
+        w_slider.setValue(v)
+    w_text.setPlainText('a')
+    w_text.setPlainText('ab')
+
+    assert calls == [('slider', 1)]
+    QTest.qWait(50)
+    assert calls == [('slider', 1), ('text', 'ab'), ('slider', 10)]
+
+    # dropping the limit sends whatever was held back
+    calls.clear()
+    w_slider.setValue(20)
+    w_slider.setValue(30)
+    render(group(dict(title='Root'), [
+        slider(on_change=lambda v: calls.append(('slider', v)), maximum=100),
+        text_edit(on_change=lambda t: calls.append(('text', t)), on_change_debounce_ms=0),
+    ]), qt_container)
+    w_slider.setValue(40)
+    assert calls == [('slider', 20), ('slider', 30), ('slider', 40)]
+
+
+def test_styles_beyond_the_registry_are_set_per_widget(qt_app, qt_container, monkeypatch):
+    from extra_qt.dom.qt_dom import style
+    from extra_qt.renderers.qt_renderer import style_registry
+
+    monkeypatch.setattr(style_registry, 'max_styles', len(style_registry.names) + 1)
+    shared, *readings = [style(color=f'#0000{i:02x}') for i in range(4)]
+
+    def labels(styles):
+        render(group(dict(title='Root'), [label(str(i), dict(style=s)) for i, s in enumerate(styles)]), qt_container)
+        return [w.host_node for w in qt_container.rendered.wrapped_children]
+
+    w_shared, *w_readings = labels([shared] + readings)
+    assert len(style_registry.names) == style_registry.max_styles
+    assert w_shared.property(style_registry.STYLE_PROPERTY) is not None and w_shared.styleSheet() == ''
+    assert all(w.property(style_registry.STYLE_PROPERTY) is None for w in w_readings)
+    assert [w.styleSheet() for w in w_readings] == [style_registry.compile(s) for s in readings]
+
+    # moving to a registered style, no style, or a string style drops the widget's own stylesheet
+    w_readings = labels([shared, shared, None, 'color: blue;'])[1:]
+    assert [w.styleSheet() for w in w_readings] == ['', '', 'color: blue;']
+    assert w_readings[0].property(style_registry.STYLE_PROPERTY) == w_shared.property(style_registry.STYLE_PROPERTY)
+
+
+def test_threaded_virtual_list_reads_its_widget_on_the_gui_thread(qt_app, qt_container, monkeypatch):
+    import threading
+    from PyQt5.QtWidgets import QScrollBar
+    from extra_qt import reconciler
+    from extra_qt.dom.qt_dom import virtual_list
+
+    reconciler.configure(threaded=True)
+    qt_container.resize(200, 200)
+    qt_container.show()
+    render(group(dict(title='Root'), [
+        virtual_list(1000, lambda i: label(f'Row {i}'), row_height=20, overscan=2),
+    ]), qt_container)
+    wrapper = qt_container.rendered.wrapped_children[0]
+
+    read_threads = set()
+    value = QScrollBar.value
+    monkeypatch.setattr(QScrollBar, 'value', lambda w: (read_threads.add(threading.get_ident()), value(w))[1])
+
+    wrapper.host_node.scroll_bar.setValue(500)
+    for _ in range(1000):
+        qt_app.processEvents()
+        if not (reconciler.rendering or reconciler.flush_scheduled):
+            break
+
+    assert read_threads == {threading.get_ident()}
+    assert wrapper.wrapped_children[0].host_node.text() == 'Row 500'
+    qt_container.hide()
+    reconciler.configure()
@@ -0,0 +1,456 @@
+import random
+
+from PyQt5.QtWidgets import QLabel
+
+from extra_qt import render, batched_updates
+from extra_qt.component import Component, PureComponent, memo
+from extra_qt.dom.qt_dom import group, label, button, create_element
+from extra_qt.renderers.qt_renderer import changed_props
+from extra_qt.renderers.renderer import longest_increasing_subsequence
+
+
+def keyed_list(items):
+    return group(dict(title='Rows'), [label(str(i), dict(key=i)) for i in items])
+
+
+def layout_texts(wrapper):
+    layout = wrapper.host_node.layout()
+    return [layout.itemAt(i).widget().text() for i in range(layout.count())]
+
+
+def widgets_by_key(wrapper):
+    return {w.element.key: w.host_node for w in wrapper.wrapped_children}
+
+
+def test_longest_increasing_subsequence():
+    assert longest_increasing_subsequence([]) == set()
+    assert longest_increasing_subsequence([0, 1, 2]) == {0, 1, 2}
+    assert len(longest_increasing_subsequence([2, 0, 1, 3])) == 3
+    assert longest_increasing_subsequence([3, 2, 1]) in ({0}, {1}, {2})
+
+
+def test_key_is_not_a_prop():
+    element = label('a', dict(key='a'))
+    assert element.key == 'a'
+    assert 'key' not in element.props
+
+
+def test_empty_props_and_children_are_shared():
+    a, b = create_element(Counter), button()
+    assert a.props is b.props and a.children is b.children
+    assert group(dict(title='a'), [label('a')]) == group(dict(title='a'), [label('a')])
+    assert group([label('a')]) != group([label('b')])
+
+
+def test_keyed_insert_retains_widgets(qt_container):
+    render(keyed_list([1, 2, 3]), qt_container)
+    root = qt_container.rendered
+    before = widgets_by_key(root)
+
+    render(keyed_list([0, 1, 2, 3]), qt_container)
+    after = widgets_by_key(root)
+
+    assert layout_texts(root) == ['0', '1', '2', '3']
+    assert all(after[k] is before[k] for k in [1, 2, 3])
+
+
+def test_keyed_edits(qt_container):
+    rng = random.Random(0)
+    items = list(range(10))
+    render(keyed_list(items), qt_container)
+    root = qt_container.rendered
+
+    for _ in range(100):
+        previous = widgets_by_key(root)
+        edit = rng.choice(['insert', 'delete', 'shuffle'])
+        if edit == 'insert':
+            items.insert(rng.randint(0, len(items)), max(items, default=0) + 1)
+        elif edit == 'delete' and items:
+            items.pop(rng.randrange(len(items)))
+        else:
+            rng.shuffle(items)
+
+        render(keyed_list(items), qt_container)
+        assert layout_texts(root) == [str(i) for i in items]
+        assert all(w is previous[k] for k, w in widgets_by_key(root).items() if k in previous)
+
+
+def test_tag_change_remounts_in_place(qt_container):
+    class Toggle(Component):
+        def render(self):
+            if self.props['on']:
+                return button(text='on')
+
+            return label('off')
+
+    def tree(on):
+        return group(dict(title='Rows'), [
+            label('first'),
+            create_element(Toggle, dict(on=on)),
+            label('last'),
+        ])
+
+    render(tree(False), qt_container)
+    render(tree(True), qt_container)
+
+    assert layout_texts(qt_container.rendered) == ['first', 'on', 'last']
+
+
+class Counter(Component):
+    initial_state = 0
+    renders = 0
+
+    def render(self):
+        Counter.renders += 1
+        return label(str(self.state))
+
+
+def test_set_state_is_coalesced_per_event_loop_pass(qt_app, qt_container):
+    render(create_element(Counter), qt_container)
+    counter = qt_container.rendered
+    Counter.renders = 0
+
+    for _ in range(50):
+        counter.component.set_state(lambda s: s + 1)
+
+    assert Counter.renders == 0
+    qt_app.processEvents()
+
+    assert Counter.renders == 1
+    assert counter.wrapped_child.host_node.text() == '50'
+
+
+def test_batched_updates_render_parents_first(qt_container):
+    class Parent(Component):
+        initial_state = 0
+
+        def render(self):
+            return group(dict(title=str(self.state)), [create_element(Counter)])
+
+    render(create_element(Parent), qt_container)
+    parent = qt_container.rendered
+    child = parent.wrapped_child.wrapped_children[0]
+    Counter.renders = 0
+
+    with batched_updates():
+        child.component.set_state(10)
+        parent.component.set_state(1)
+        child.component.set_state(lambda s: s + 1)
+
+    assert Counter.renders == 1
+    assert child.wrapped_child.host_node.text() == '11'
+    assert parent.wrapped_child.host_node.title() == '1'
+
+
+def test_changed_props():
+    on_click = print
+    assert changed_props({'text': 'a', 'on_click': on_click}, {'text': 'a', 'on_click': on_click}) == set()
+    assert changed_props({'text': 'a', 'style': 'x'}, {'text': 'b'}) == {'text', 'style'}
+
+
+def test_unchanged_props_skip_setters(qt_container, monkeypatch):
+    render(group(dict(title='Rows'), [label('a'), label('b')]), qt_container)
+    calls = []
+    monkeypatch.setattr(QLabel, 'setText', lambda w, text: calls.append(text))
+
+    render(group(dict(title='Rows'), [label('a'), label('c')]), qt_container)
+    assert calls == ['c']
+
+
+def test_pure_components_skip_rendering(qt_container):
+    renders = []
+
+    class Leaf(PureComponent):
+        initial_state = 0
+
+        def render(self):
+            renders.append(self.props['text'])
+            return label(f'{self.props["text"]} {self.state}')
+
+    MemoLeaf = memo(Leaf, are_equal=lambda p, n: p['text'].lower() == n['text'].lower())
+
+    def tree(title, text):
+        return group(dict(title=title), [
+            create_element(Leaf, dict(text='stable')),
+            create_element(Leaf, dict(text=text)),
+            create_element(MemoLeaf, dict(text=text.upper())),
+        ])
+
+    render(tree('first', 'a'), qt_container)
+    renders.clear()
+
+    render(tree('second', 'a'), qt_container)
+    assert renders == []
+
+    render(tree('third', 'b'), qt_container)
+    assert renders == ['b', 'B']
+
+    leaf = qt_container.rendered.wrapped_children[0]
+    with batched_updates():
+        leaf.component.set_state(0)
+    assert renders == ['b', 'B']
+
+    with batched_updates():
+        leaf.component.set_state(1)
+    assert renders == ['b', 'B', 'stable']
+    assert leaf.host_node.text() == 'stable 1'
+
+
+def test_incremental_updates_commit_once_finished(qt_app, qt_container):
+    from extra_qt import reconciler
+
+    class Row(Component):
+        def render(self):
+            return label(f'{self.props["title"]} {self.props["tick"]}')
+
+    class Table(Component):
+        initial_state = 0
+
+        def render(self):
+            return group(dict(title='Table'), [
+                create_element(Row, dict(title=f'Row {i}', tick=self.state)) for i in range(200)
+            ])
+
+    reconciler.configure(incremental=True, frame_budget_ms=0.05)
+    render(create_element(Table), qt_container)
+    table = qt_container.rendered
+    rows = table.wrapped_child.wrapped_children
+
+    table.component.set_state(1)
+    qt_app.processEvents()
+    assert reconciler.work_stack, 'expected the update to take more than one slice'
+    assert rows[-1].host_node.text() == 'Row 199 0'
+
+    for _ in range(10000):
+        if not reconciler.work_stack:
+            break
+        qt_app.processEvents()
+
+    assert [row.host_node.text() for row in rows] == [f'Row {i} 1' for i in range(200)]
+
+
+def test_incremental_tag_change_after_keyed_insert(qt_app, qt_container):
+    from extra_qt import reconciler
+
+    class Toggle(Component):
+        def render(self):
+            if self.props['on']:
+                return button(text='on')
+
+            return label('off')
+
+    class Parent(Component):
+        initial_state = False
+
+        def render(self):
+            head = [label('new', dict(key='new'))] if self.state else []
+            return group(dict(title='Rows'), head + [
+                create_element(Toggle, dict(on=self.state, key='toggle')),
+                label('last', dict(key='last')),
+            ])
+
+    reconciler.configure(incremental=True)
+    render(create_element(Parent), qt_container)
+    parent = qt_container.rendered
+
+    parent.component.set_state(True)
+    for _ in range(100):
+        qt_app.processEvents()
+        if not (reconciler.work_stack or reconciler.flush_scheduled):
+            break
+
+    assert layout_texts(parent.wrapped_child) == ['new', 'on', 'last']
+
+
+def test_render_finishes_interrupted_update(qt_app, qt_container):
+    from extra_qt import reconciler
+
+    class Table(Component):
+        initial_state = 0
+
+        def render(self):
+            return group(dict(title='Table'), [
+                label(f'Row {i} {self.state}', dict(key=i)) for i in range(self.props['n'])
+            ])
+
+    reconciler.configure(incremental=True, frame_budget_ms=0.05)
+    render(create_element(Table, dict(n=200)), qt_container)
+    table = qt_container.rendered
+
+    table.component.set_state(1)
+    qt_app.processEvents()
+    assert reconciler.work_stack, 'expected the update to take more than one slice'
+
+    render(create_element(Table, dict(n=5)), qt_container)
+    for _ in range(100):
+        qt_app.processEvents()
+
+    assert not reconciler.work_stack
+    assert layout_texts(table.wrapped_child) == [f'Row {i} 1' for i in range(5)]
+
+
+def test_before_receive_props_compares_shallowly(dict_container):
+    received = []
+
+    class Child(Component):
+        def before_receive_props(self, next_props, next_children):
+            received.append(next_props['title'])
+
+        def render(self):
+            return group(dict(title=self.props['title']), self.children)
+
+    leaf = label('leaf')
+    render(create_element(Child, dict(title='a'), [leaf]), dict_container)
+    render(create_element(Child, dict(title='a'), [leaf]), dict_container)
+    assert received == []
+
+    render(create_element(Child, dict(title='b'), [leaf]), dict_container)
+    render(create_element(Child, dict(title='b'), [label('leaf')]), dict_container)
+    assert received == ['b', 'b']
+
+
+def test_profiler(dict_container, tmp_path):
+    import json
+    from extra_qt import profile, reconciler
+
+    class Row(Component):
+        def render(self):
+            return label(self.props['title'])
+
+    def tree(titles):
+        return group(dict(title='Rows'), [create_element(Row, dict(title=t)) for t in titles])
+
+    render(tree(['a', 'b']), dict_container)
+    with profile() as profiler:
+        render(tree(['a', 'c', 'd']), dict_container)
+
+    assert reconciler.profiler is None
+    assert profiler.stats['Row'].renders == 3
+    assert profiler.stats['Row'].wasted_renders == 1
+    assert profiler.stats['GROUP'].inclusive >= profiler.stats['Row'].inclusive
+    assert profiler.nodes_created == 1
+    assert profiler.commits == [2]  # an updated label and a mounted row
+    assert 'Row' in profiler.summary()
+
+    path = tmp_path / 'trace.json'
+    profiler.write_trace(str(path))
+    events = json.loads(path.read_text())['traceEvents']
+    assert {'update', 'mount', 'effect'} <= {e['cat'] for e in events}
+
+
+def test_threaded_render_commits_on_gui_thread(qt_app, qt_container, monkeypatch):
+    import threading
+    from extra_qt import reconciler
+
+    render_threads, commit_threads = set(), set()
+
+    class Telemetry(Component):
+        initial_state = 0
+
+        def render(self):
+            render_threads.add(threading.get_ident())
+            return label(f'Reading {self.state}')
+
+    reconciler.configure(threaded=True)
+    render(create_element(Telemetry), qt_container)
+    telemetry = qt_container.rendered
+    w = telemetry.wrapped_child.host_node
+    set_text = QLabel.setText
+    monkeypatch.setattr(QLabel, 'setText', lambda w, text: (commit_threads.add(threading.get_ident()),
+                                                           set_text(w, text)))
+
+    render_threads.clear()
+    telemetry.component.set_state(1)
+    for _ in range(1000):
+        qt_app.processEvents()
+        if not (reconciler.rendering or reconciler.flush_scheduled):
+            break
+
+    main = threading.get_ident()
+    assert render_threads and main not in render_threads
+    assert commit_threads == {main}
+
+    monkeypatch.undo()
+    telemetry.component.set_state(2)
+    qt_app.processEvents()
+    render(create_element(Telemetry), qt_container)  # waits for the render in progress
+    assert w.text() == 'Reading 2'
+    reconciler.configure()
+
+
+def test_static_subtrees_are_skipped(qt_container):
+    from extra_qt import reconciler
+    from extra_qt.dom.qt_dom import static, hoist
+
+    @hoist
+    def header(title):
+        return group(dict(title=title), [label(f'{title} {i}') for i in range(3)])
+
+    assert header('A') is header('A')
+    assert header('A').is_static and header('A').children[0].is_static
+    assert static(header('A')) is header('A')
+
+    def panel(title, tick):
+        return group(dict(title='Root'), [header(title), label(f'Tick {tick}')])
+
+    render(panel('A', 0), qt_container)
+    with reconciler.record_mutations() as log:
+        render(panel('A', 1), qt_container)
+
+    with reconciler.profile() as profiler:
+        render(panel('A', 2), qt_container)
+
+    assert log.counts() == {'set_prop': 1}
+    # the hoisted group and its labels were skipped, only the root group and tick label were reconciled
+    assert [e['name'] for e in profiler.events if e['cat'] == 'update'] == ['GROUP', 'LABEL']
+
+    render(panel('B', 3), qt_container)
+    assert layout_texts(qt_container.rendered.wrapped_children[0]) == ['B 0', 'B 1', 'B 2']
+
+
+def test_immutable_state_is_compared_by_identity(qt_container):
+    from dataclasses import dataclass, field
+    from extra_qt import evolve
+
+    @dataclass(frozen=True)
+    class State:
+        count: int = 0
+        history: tuple = field(default=(), compare=False)
+
+        def increment(self):
+            return evolve(self, count=self.count + 1)
+
+        def reset(self):
+            return evolve(self, count=0)
+
+    renders = []
+
+    class Counter(PureComponent):
+        initial_state_cls = State
+        increment = Component.updates_state(State.increment)
+        reset = Component.updates_state(State.reset)
+
+        def render(self):
+            renders.append(self.state.count)
+            return label(str(self.state.count))
+
+    render(create_element(Counter), qt_container)
+    counter = qt_container.rendered.component
+    state = counter.state
+    assert evolve(state, count=0) is state and evolve(state, count=1) == State(1)
+
+    with batched_updates():
+        counter.set_state(dict(count=0))
+    assert counter.state is state and renders == [0]
+
+    # giving back the same immutable state is no change, rather than a mutation in place
+    with batched_updates():
+        counter.reset()
+        counter.set_state(lambda s: s)
+    assert counter.state is state and renders == [0]
+
+    with batched_updates():
+        counter.increment()
+        counter.set_state(dict(history=(1,)))
+    assert renders == [0, 1] and state == State(0)
+    assert counter.state == State(1, (1,))